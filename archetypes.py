@@ -0,0 +1,56 @@
+import collections
+import logging
+import logsetup
+import random
+
+import settings
+from sprites import Enemy
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+Archetype = collections.namedtuple("Archetype", ["name", "spritesheet_position", "attack_sprite_position",
+                                                 "attack_power", "veldiff", "max_health", "radius"])
+
+
+class ArchetypeRegistry:
+    """ Enemy kinds, built from a table like settings.enemy_archetypes """
+
+    def __init__(self, table, boss_name):
+        self.archetypes = {row[0]: Archetype(*row) for row in table}
+        self.boss = self.archetypes[boss_name]
+        self.spawnable = [archetype for archetype in self.archetypes.values() if archetype is not self.boss]
+        logger.info("%s enemy archetypes registered", len(self.archetypes))
+
+    def choose(self, boss_fight):
+        if boss_fight:
+            return self.boss
+        return random.choice(self.spawnable)
+
+    def create(self, archetype, sid, xpos, ypos):
+        """ one body and one shape per enemy """
+        return Enemy(sid, xpos, ypos,
+                     spritesheet_positions=[archetype.spritesheet_position],
+                     attack_sprite_position=archetype.attack_sprite_position,
+                     velocity=(0, 0),
+                     max_health=archetype.max_health,
+                     attack_power=archetype.attack_power,
+                     veldiff=archetype.veldiff,
+                     radius=archetype.radius,
+                     boss=archetype is self.boss,
+                     kind=archetype.name)
+
+    def respawn(self, enemy, archetype, sid, xpos, ypos):
+        """ turn a pooled enemy into a fresh one of this archetype """
+        enemy.respawn(sid, xpos, ypos,
+                      spritesheet_positions=[archetype.spritesheet_position],
+                      attack_sprite_position=archetype.attack_sprite_position,
+                      max_health=archetype.max_health,
+                      attack_power=archetype.attack_power,
+                      veldiff=archetype.veldiff,
+                      radius=archetype.radius,
+                      boss=archetype is self.boss,
+                      kind=archetype.name)
+
+
+registry = ArchetypeRegistry(settings.enemy_archetypes, settings.boss_archetype)
@@ -0,0 +1,126 @@
+""" Prebuilt asset bundle: image banks preprocessed into one file read at startup.
+
+    python assets.py    # rebuild settings.asset_bundle after changing a png
+
+A bundle is a json header followed by raw blobs, one hex digit per pixel (the format
+pyxel.Image.set takes). Anything whose source changed on disk since the build, or a missing
+bundle, falls back to loading the source file. Levels have their own compiled file, see level.py.
+"""
+import json
+import logging
+import logsetup
+import os
+import struct
+import sys
+
+import pyxel
+
+import settings
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+MAGIC = b"GPAB"
+VERSION = 1
+PREFIX = struct.Struct("<4sHI")  # magic, version, header length
+
+
+def png_size(path):
+    """ (width, height) from a png's IHDR chunk """
+    with open(path, "rb") as f:
+        return struct.unpack(">II", f.read(24)[16:24])
+
+
+class Bundle:
+    """ A bundle read into memory in one go, blobs are decoded when they are first asked for """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.buf = f.read()
+        magic, version, header_length = PREFIX.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} asset bundle")
+        self.header = json.loads(self.buf[PREFIX.size:PREFIX.size + header_length])
+        self.data_start = PREFIX.size + header_length
+        self.path = path
+
+    def fresh(self, entry):
+        """ True if the entry's source file is unchanged since the bundle was built """
+        try:
+            return os.stat(entry["source"]).st_mtime == entry["mtime"]
+        except OSError:
+            return True  # shipped without sources
+
+    def blob(self, entry):
+        start = self.data_start + entry["offset"]
+        return self.buf[start:start + entry["length"]]
+
+    def image_rows(self, source):
+        """ rows of hex digits for pyxel.Image.set, or None if the bundle has no fresh copy """
+        entry = self.header["images"].get(source)
+        if entry is None or not self.fresh(entry):
+            return None
+        text = self.blob(entry).decode("ascii")
+        width = entry["width"]
+        return [text[start:start + width] for start in range(0, len(text), width)]
+
+
+_bundle = None
+
+
+def bundle():
+    """ the asset bundle, read on first use, or None if it is missing or unreadable """
+    global _bundle
+    if _bundle is None:
+        try:
+            _bundle = Bundle(settings.asset_bundle)
+        except (OSError, ValueError) as e:
+            logger.warning("no asset bundle, loading source files (%s)", e)
+            _bundle = False
+    return _bundle or None
+
+
+def load_images():
+    """ fill the image banks in settings.asset_images, from the bundle where it is fresh """
+    cached = bundle()
+    for bank, source in settings.asset_images:
+        rows = cached.image_rows(source) if cached else None
+        if rows is None:
+            logger.info("loading %s into image %s", source, bank)
+            pyxel.image(bank).load(0, 0, source)
+        else:
+            pyxel.image(bank).set(0, 0, rows)
+
+
+def build(path):
+    """ write a bundle of settings.asset_images, needs a real pyxel window """
+    pyxel.init(settings.canvas_x, settings.canvas_y)
+    header = {"images": {}}
+    blobs = []
+    offset = 0
+
+    def add(section, source, data, **extra):
+        nonlocal offset
+        header[section][source] = dict(source=source, mtime=os.stat(source).st_mtime,
+                                       offset=offset, length=len(data), **extra)
+        blobs.append(data)
+        offset += len(data)
+
+    for bank, source in settings.asset_images:
+        width, height = png_size(source)
+        image = pyxel.image(bank)
+        image.load(0, 0, source)
+        text = "".join(f"{image.get(x, y):x}" for y in range(height) for x in range(width))
+        add("images", source, text.encode("ascii"), width=width, height=height)
+
+    encoded = json.dumps(header).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, VERSION, len(encoded)))
+        f.write(encoded)
+        for blob in blobs:
+            f.write(blob)
+    logger.info("wrote %s: %s images, %s bytes", path, len(header["images"]), PREFIX.size + len(encoded) + offset)
+
+
+if __name__ == "__main__":
+    build(sys.argv[1] if len(sys.argv) > 1 else settings.asset_bundle)
@@ -0,0 +1,73 @@
+""" Compare pymunk space step time across index and threading configurations.
+
+    python bench_space.py [--steps 500] [--bodies 10 50 200]
+
+Bodies are enemy sized circles pushed around at random inside the level boundaries, stepped with
+settings.space_dt, so the numbers are comparable to the space_step phase of the game.
+"""
+import argparse
+import random
+import time
+
+import pymunk
+
+import physics
+import settings
+from benchstats import percentile
+
+CONFIGS = [
+    ("settings (shipped)", {}),
+    ("bbtree, unthreaded", dict(threaded=False, spatial_hash=False)),
+    ("bbtree, threaded 1 thread", dict(threaded=True, threads=1, spatial_hash=False)),
+    ("bbtree, 2 threads", dict(threaded=True, threads=2, spatial_hash=False)),
+    ("hash 16, unthreaded", dict(threaded=False, spatial_hash=True, hash_dim=16)),
+    ("hash 16, 2 threads", dict(threaded=True, threads=2, spatial_hash=True, hash_dim=16)),
+    ("hash 32, unthreaded", dict(threaded=False, spatial_hash=True, hash_dim=32)),
+    ("hash 32, threaded 1 thread", dict(threaded=True, threads=1, spatial_hash=True, hash_dim=32)),
+    ("hash 32, 2 threads", dict(threaded=True, threads=2, spatial_hash=True, hash_dim=32)),
+    ("hash 16, 2 threads, 5 iterations", dict(threaded=True, threads=2, spatial_hash=True, hash_dim=16,
+                                              iterations=5)),
+]
+
+
+def bench(config, bodies, steps, seed):
+    rng = random.Random(seed)
+    space = physics.make_space(**config)
+    static = pymunk.Body(body_type=pymunk.Body.STATIC)
+    space.add(*physics.boundary_shapes(static))
+
+    movers = []
+    for _ in range(bodies):
+        body = pymunk.Body(1, 1)
+        body.position = rng.uniform(0, settings.canvas_x), rng.uniform(75, 125)
+        space.add(body, pymunk.Circle(body, 8))
+        movers.append(body)
+
+    timings = []
+    for _ in range(steps):
+        for body in movers:
+            if rng.random() < 0.3:
+                body.apply_impulse_at_local_point((rng.choice((-1, 0, 1)) * settings.enemy_veldiff,
+                                                   rng.choice((-1, 0, 1)) * settings.enemy_veldiff), (0, 0))
+        start = time.perf_counter()
+        space.step(settings.space_dt)
+        timings.append(time.perf_counter() - start)
+    return sum(timings) / len(timings), percentile(timings, 99)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--bodies", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for bodies in args.bodies:
+        print(f"{bodies} bodies, {args.steps} steps")
+        for name, config in CONFIGS:
+            mean, p99 = bench(config, bodies, args.steps, args.seed)
+            print(f"  {name:<34} mean {mean * 1000:.3f}ms, p99 {p99 * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
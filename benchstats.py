@@ -0,0 +1,7 @@
+""" Timing statistics shared by headless.py, loadtest.py and bench_space.py, free of pyxel and game imports. """
+
+
+def percentile(values, pct):
+    """ nearest rank percentile of a list of numbers """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
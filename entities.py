@@ -0,0 +1,131 @@
+import logging
+import logsetup
+
+import numpy
+
+import settings
+from protocol import BUTTON_UP, BUTTON_DOWN, BUTTON_LEFT, BUTTON_RIGHT
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+FACING_LEFT = 0
+FACING_RIGHT = 1
+FACINGS = ('left', 'right')
+
+DIRECTION_MASK = BUTTON_UP | BUTTON_DOWN | BUTTON_LEFT | BUTTON_RIGHT
+
+# unit impulse for every combination of held direction buttons, opposite directions cancel
+DIRECTION_TUPLES = tuple((bool(bits & BUTTON_RIGHT) - bool(bits & BUTTON_LEFT),
+                          bool(bits & BUTTON_DOWN) - bool(bits & BUTTON_UP))
+                         for bits in range(DIRECTION_MASK + 1))
+DIRECTIONS = numpy.array(DIRECTION_TUPLES, dtype=numpy.float64)
+
+# name, dtype, value for a fresh slot
+FIELDS = (('health', numpy.float64, 0),
+          ('max_health', numpy.float64, 1),
+          ('attack_frames', numpy.float64, 0),
+          ('death_frames', numpy.int32, 0),
+          ('dead', numpy.bool_, False),
+          ('boss', numpy.bool_, False),
+          ('active', numpy.bool_, False),
+          ('facing', numpy.int8, FACING_LEFT),
+          ('buttons', numpy.uint8, 0),
+          ('veldiff', numpy.float64, 0),
+          ('spritesheet_idx', numpy.int8, 0),
+          ('render_dirty', numpy.bool_, True))
+
+
+class EnemyStore:
+    """ Struct-of-arrays for the enemy state Game.update and Sprite.draw walk every tick.
+
+    Every enemy owns a slot, its attributes are views into these arrays, so per-tick countdowns
+    and deaths run as one numpy operation over all active enemies.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = 0
+        self.sprites = []
+        self.free_slots = []
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        for name, dtype, value in FIELDS:
+            grown = numpy.full(capacity, value, dtype=dtype)
+            if self.capacity:
+                grown[:self.capacity] = getattr(self, name)
+            setattr(self, name, grown)
+        self.sprites.extend([None] * (capacity - self.capacity))
+        self.free_slots.extend(reversed(range(self.capacity, capacity)))
+        logger.debug("enemy store holds %s slots", capacity)
+        self.capacity = capacity
+
+    def allocate(self, sprite):
+        if not self.free_slots:
+            self._grow(self.capacity * 2)
+        slot = self.free_slots.pop()
+        for name, dtype, value in FIELDS:
+            getattr(self, name)[slot] = value
+        self.sprites[slot] = sprite
+        return slot
+
+    def free(self, slot):
+        self.active[slot] = False
+        self.sprites[slot] = None
+        self.free_slots.append(slot)
+
+    def countdown_attacks(self):
+        """ one tick of every attack, returns the sprites whose attack just ended """
+        attacking = self.active & (self.attack_frames > 0)
+        self.attack_frames[attacking] -= 1
+        ended = attacking & (self.attack_frames <= 0)
+        self.render_dirty[ended] = True
+        return [self.sprites[slot] for slot in numpy.flatnonzero(ended)]
+
+    def impulses(self):
+        """ (body, impulse) for every active enemy holding a direction, one table lookup times veldiff """
+        directions = DIRECTIONS[self.buttons & DIRECTION_MASK]
+        impulse_x = directions[:, 0] * self.veldiff
+        impulse_y = directions[:, 1] * self.veldiff
+        moving = numpy.flatnonzero(self.active & ((impulse_x != 0) | (impulse_y != 0)))
+        return [(self.sprites[slot].body, (impulse_x.item(slot), impulse_y.item(slot))) for slot in moving]
+
+    def tick_deaths(self, death_duration):
+        """ one tick of the death countdown, returns (dead bosses to kill, whether a boss just died) """
+        active = self.active
+        finished = active & self.dead & self.boss
+        dying = active & ~finished & (self.death_frames > 0)
+        starting = active & ~finished & ~dying & (self.health <= 0)
+
+        self.death_frames[dying] -= 1
+        newly_dead = dying & (self.death_frames <= 0)
+        self.dead[newly_dead] = True
+        self.death_frames[starting] = death_duration
+        self.render_dirty[starting] = True
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for slot in numpy.flatnonzero(newly_dead):
+                logger.debug("%s TRUE DEATH!", self.sprites[slot].id)
+        return ([self.sprites[slot] for slot in numpy.flatnonzero(finished)],
+                bool((newly_dead & self.boss).any()))
+
+
+def slot_field(name, renders=False):
+    """ property reading and writing one enemy's slot in the store as a plain python value.
+
+    Writing a field that renders marks the enemy's cached draw arguments dirty.
+    """
+    def getter(self):
+        return getattr(enemies, name).item(self.slot)
+
+    if renders:
+        def setter(self, value):
+            getattr(enemies, name)[self.slot] = value
+            enemies.render_dirty[self.slot] = True
+    else:
+        def setter(self, value):
+            getattr(enemies, name)[self.slot] = value
+    return property(getter, setter)
+
+
+enemies = EnemyStore(settings.max_enemies + 8)
@@ -0,0 +1,77 @@
+import collections
+import logging
+import logsetup
+import time
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+SPAWN = 'spawn'
+PRESS = 'press'
+RELEASE = 'release'
+DISCONNECT = 'disconnect'
+INPUT = 'input'  # data is [(seq, buttons)] decoded from the binary protocol
+
+ACTION_BUTTONS = ('a', 'b')
+
+
+class EventQueue:
+    """ Hands controller events from the server thread to the game loop.
+
+    deque.append and deque.popleft are atomic, so the server thread never waits on the game loop.
+    """
+
+    def __init__(self):
+        self._events = collections.deque()
+        self.drained = 0
+        self.coalesced = 0
+        self.latency = 0.0
+
+    def __len__(self):
+        return len(self._events)
+
+    def put(self, kind, sid, data=None):
+        self._events.append((kind, sid, data, time.perf_counter()))
+
+    def drain(self):
+        """ pop everything queued so far and coalesce it, called once per tick from the game loop """
+        events = []
+        popleft = self._events.popleft
+        for _ in range(len(self._events)):
+            events.append(popleft())
+        if not events:
+            self.latency = 0.0
+            return events
+
+        self.latency = time.perf_counter() - events[0][3]
+        self.drained += len(events)
+        coalesced = coalesce(events)
+        self.coalesced += len(events) - len(coalesced)
+        return coalesced
+
+
+def coalesce(events):
+    """ drop input events that are overridden within the same tick.
+
+    Only the last press/release of each button per sid survives, and releasing an action button
+    does nothing, so a burst of mashing costs one event per button instead of one per message.
+    Binary protocol inputs carry their own sequence numbers and are all kept. Spawns and
+    disconnects are kept in order and start a fresh input history for their sid.
+    """
+    kept = []
+    seen = set()
+    for event in reversed(events):
+        kind, sid, data, _ = event
+        if kind == PRESS or kind == RELEASE:
+            if kind == RELEASE and data in ACTION_BUTTONS:
+                continue
+            if (sid, data) in seen:
+                continue
+            seen.add((sid, data))
+        elif kind == INPUT:
+            pass
+        else:
+            seen = {key for key in seen if key[0] != sid}
+        kept.append(event)
+    kept.reverse()
+    return kept
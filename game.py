@@ -1,57 +1,84 @@
 import pymunk
 import logging
-import sys
+import logsetup
 import pyxel
 import settings
-import csv
-import random
+import time
 
-from sprites import Player, Enemy, Baby, Girl, Woman, Pregnant, Boy, Man, Granda, Boss
+import entities
+import events
+import level
+import overlays
+import physics
+import pool
+import profiler
+
+from archetypes import registry
+from sprites import Player, Enemy
+from sprites import (COLLISION_PLAYER, COLLISION_ENEMY, COLLISION_WALL, COLLISION_DEATH_WALL,
+                     COLLISION_ENEMY_ATTACKING)
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)
+logsetup.configure()
 
 
-def resolve_player_collision(arbiter, space, data):
-    if isinstance(arbiter.shapes[0], pymunk.Segment):
-        arbiter.shapes[1].body.sprite.health -= settings.det_wall_dmg
-        return
-    if isinstance(arbiter.shapes[1], pymunk.Segment):
-        arbiter.shapes[0].body.sprite.health -= settings.det_wall_dmg
-        return
+def resolve_attack(arbiter, space, data):
+    """ post_solve for sprite pairs that can hurt each other, hits are applied once per tick """
     sprite_a = arbiter.shapes[0].body.sprite
     sprite_b = arbiter.shapes[1].body.sprite
 
+    if sprite_a.attack_frames <= 0 and sprite_b.attack_frames <= 0:
+        return  # e.g. a player walking into an enemy
     if sprite_a.death_frames > 0 or sprite_b.death_frames > 0:
         return
     if sprite_a.dead or sprite_b.dead:
         return
 
     if sprite_a.is_attacking():
-        logger.info(f"{sprite_a.id} hit {sprite_b.id} for {sprite_a.attack_power}, {sprite_b.health} left")
-        sprite_b.health -= sprite_a.attack_power
-        pyxel.play(1, 0)
+        data['hits'].append((sprite_b, sprite_a.attack_power))
     if sprite_b.is_attacking():
-        logger.info(f"{sprite_b.id} hit {sprite_a.id} for {sprite_b.attack_power}, {sprite_a.health} left")
-        sprite_a.health -= sprite_b.attack_power
-        pyxel.play(1, 0)
+        data['hits'].append((sprite_a, sprite_b.attack_power))
+
+
+def resolve_death_wall(arbiter, space, data):
+    """ post_solve for the death wall against a sprite """
+    data['wall_hits'].append(arbiter.shapes[1].body.sprite)
+
+
+def grandad_wall():
+    """ the column of grandas at the left edge, one baked strip per animation phase """
+    u, v = settings.grandad_sprite
+    phases = []
+    for offset, (strip_u, strip_v) in zip(settings.grandad_frame_offsets, settings.grandad_strips):
+        blts = [(settings.grandad_wall_x, y, 0, u, v + offset, 16, 16) for y in settings.grandad_wall_ys]
+        phases.append(overlays.bake_strip(blts, settings.grandad_strip_bank, strip_u, strip_v, 0))
+    return overlays.PhasedOverlay(phases)
+
+
+# image the level's tiles come from, compiling the level depends on it
+LEVEL_TILESET = dict(settings.asset_images)[settings.level_imagebank]
+
+# per-player attributes a round reset puts back
+PLAYER_STATE = ('health', 'attack_frames', 'death_frames', 'dead', 'facing', 'spritesheet_idx', 'impulse', 'visible')
 
 
 class Game:
     """ Class used for game """
 
-    def __init__(self, fps=1):
-        pyxel.image(0).load(0, 0, "assets/villagers-export.png")
-        pyxel.image(1).load(0, 0, "assets/16X16-export.png")
+    def __init__(self, fps=1, recorder=None, event_queue=None):
+        self.recorder = recorder
+        self.grandad_wall = grandad_wall()
+        self.level = self.open_level()
+        self.level_compositor = level.LevelCompositor(self.level, settings.level_imagebank,
+                                                      settings.level_first_tilemap, settings.level_view_cols,
+                                                      settings.level_blank_tile, settings.level_stream_slots,
+                                                      settings.level_prefetch_cols,
+                                                      settings.level_chunk_writes_per_frame)
         self._init_space()
-        lines = []
         body = pymunk.Body(body_type=pymunk.Body.STATIC)
-        for x in [z for z in range(0, 41)] + [z for z in range(158, 166)]:
-            lines.append(pymunk.Segment(body, (0, x), (255, x), 30))
-        lines.append(pymunk.Segment(body, (-25, 0), (-25, 144), 30))
-        # lines.append(pymunk.Segment(body, (265, 0), (265, 144), 30))
-        for line in lines:
-            self.space.add(line)
+        for shape in physics.boundary_shapes(body):
+            shape.collision_type = COLLISION_WALL
+            self.space.add(shape)
         death_wall = Enemy(0, xpos=0, ypos=0, imagebank=0,
                            spritesheet_positions=[(3, 57)], attack_sprite_position=(0, 0), width=1,
                            height=settings.canvas_y, spritesheet_keycol=0, mass=100, momentum=1, velocity=(0, 0),
@@ -59,10 +86,11 @@ class Game:
         death_wall.attack_frames = pymunk.inf
         death_wall.health = pymunk.inf
         death_wall.poly = pymunk.Segment(body, (0, 0), (0, 144), 10)
-        death_wall.poly.collision_type = 1
+        death_wall.poly.collision_type = COLLISION_DEATH_WALL
         death_wall.body = pymunk.Segment(body, (0, 0), (0, 144), 10)
         death_wall.body.sprite = death_wall
         self.space.add(death_wall.body, death_wall.poly)
+        self.death_wall = death_wall
 
         logger.info("game initialized.")
         start_y = 50
@@ -78,7 +106,7 @@ class Game:
         self.dead_grannys = []
         self.enemies = {}
 
-        self.new_enemies = []
+        self.events = event_queue if event_queue is not None else events.EventQueue()
 
         for player in self.players.values():
             self.space.add(player.body, player.poly)
@@ -87,15 +115,101 @@ class Game:
         self.boss_dead = False
         self.running = False
 
-    def _init_space(self):
-        """ gravity, canvas etc """
-        self.space = pymunk.Space(threaded=True)
-        self.space.damping = settings.space_damping
-        self.colhandler = self.space.add_collision_handler(1, 1)
-        self.colhandler.post_solve = resolve_player_collision
-        self.space.damping = settings.space_damping
+        self.physics_accumulator = 0.0
+        self.last_tick = None
+        self.level_poll_frames = 0
+        self.alpha = 1.0
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self):
+        """ the start-of-round state restore() puts back, players are kept by reference """
+        return {"players": [(player, player.body.position, {name: getattr(player, name) for name in PLAYER_STATE})
+                            for player in self.players.values()],
+                "fields": {"boss_fight": self.boss_fight,
+                           "boss_dead": self.boss_dead,
+                           "running": self.running}}  # the tick clock and physics accumulator carry on
+
+    def restore(self, keep_enemies):
+        """ put the round back to the snapshot in place, the space, level and walls are reused.
+
+        Dead players rejoin the space. With keep_enemies connected enemies respawn as the same
+        kind at the spawn point, bosses and everything else are killed.
+        """
+        for enemy in list(self.enemies.values()):
+            if keep_enemies and not enemy.boss:
+                self.space.remove(enemy.body, enemy.poly)
+                registry.respawn(enemy, registry.archetypes[enemy.kind], enemy.id, *settings.enemy_spawn)
+                entities.enemies.active[enemy.slot] = True
+                self.space.add(enemy.body, enemy.poly)
+            else:
+                self.kill(enemy)
+
+        players = {}
+        for player, position, state in self.snapshot["players"]:
+            if player.id not in self.players:
+                self.space.add(player.body, player.poly)
+            players[player.id] = player
+            player.body.position = position
+            player.body.velocity = (0, 0)
+            player.body.angular_velocity = 0
+            player.body.angle = 0
+            player.prev_position = player.body.position
+            for name, value in state.items():
+                setattr(player, name, value)
+        self.players = players
+
+        for name, value in self.snapshot["fields"].items():
+            setattr(self, name, value)
+        self.dead_grannys = []
+        self.hits.clear()
+        self.wall_hits.clear()
 
-    def reset(self):
+    def _init_space(self):
+        """ gravity, canvas etc.
+
+        Only pairs that can deal damage get a python callback. An attacking enemy's shape switches to
+        COLLISION_ENEMY_ATTACKING for the length of the attack, so enemies bumping into each other and
+        anything touching a boundary wall stay inside chipmunk.
+        """
+        self.space = physics.make_space()
+        self.hits = []
+        self.wall_hits = []
+        for type_a, type_b, callback in ((COLLISION_PLAYER, COLLISION_PLAYER, resolve_attack),
+                                         (COLLISION_PLAYER, COLLISION_ENEMY, resolve_attack),
+                                         (COLLISION_PLAYER, COLLISION_ENEMY_ATTACKING, resolve_attack),
+                                         (COLLISION_ENEMY_ATTACKING, COLLISION_ENEMY, resolve_attack),
+                                         (COLLISION_ENEMY_ATTACKING, COLLISION_ENEMY_ATTACKING, resolve_attack),
+                                         (COLLISION_DEATH_WALL, COLLISION_PLAYER, resolve_death_wall),
+                                         (COLLISION_DEATH_WALL, COLLISION_ENEMY, resolve_death_wall),
+                                         (COLLISION_DEATH_WALL, COLLISION_ENEMY_ATTACKING, resolve_death_wall)):
+            handler = self.space.add_collision_handler(type_a, type_b)
+            handler.data['hits'] = self.hits
+            handler.data['wall_hits'] = self.wall_hits
+            handler.post_solve = callback
+
+    def contact_pairs(self):
+        """ number of shape pairs currently touching a sprite, for checking broadphase load """
+        pairs = set()
+        for sprite in self.sprites():
+            sprite.body.each_arbiter(lambda arbiter: pairs.add(frozenset(map(id, arbiter.shapes))))
+        return len(pairs)
+
+    def apply_hits(self):
+        """ apply the damage buffered by the collision handlers during this tick's space steps """
+        if self.hits:
+            debug = logger.isEnabledFor(logging.DEBUG)
+            for sprite, damage in self.hits:
+                sprite.health -= damage
+                if debug:
+                    logger.debug("%s hit for %s, %s left", sprite.id, damage, sprite.health)
+            pyxel.play(1, 0)
+            self.hits.clear()
+        for sprite in self.wall_hits:
+            sprite.health -= settings.det_wall_dmg
+        self.wall_hits.clear()
+
+    def clear(self):
+        """ kill every sprite and give back store slots, so nothing outlives this game's space """
         objs_to_kill = []
         for player in self.players.values():
             objs_to_kill.append(player)
@@ -104,86 +218,131 @@ class Game:
 
         for obj in objs_to_kill:
             self.kill(obj)
-        self.dead_grannys = []
-        pyxel.frame_count = 0
-        self.__init__()
-
-    def draw_csv(self, csv_file, offset):
-        if offset >= 512 - 32:
-            offset = 512 - 32
-            self.boss_fight = True
+        entities.enemies.free(self.death_wall.slot)
 
-        with open(csv_file) as csv_map:
-            csv_reader = csv.reader(csv_map, delimiter=',')
-            y_pos = 0
-            for row in csv_reader:
-                x_pos = 0
-                for value in row[0 + offset:32 + offset]:
-                    y = (int(value) // 32)
-                    x = (int(value) % 32)
-                    pyxel.blt(x_pos, y_pos, 1, x * 8, y * 8, 8, 8, 0)
-                    x_pos += 8
-                y_pos += 8
+    def reset(self):
+        """ start a new round without touching disk or rebuilding the space """
+        started = time.perf_counter()
+        self.restore(keep_enemies=settings.reset_keeps_enemies)
+        pyxel.frame_count = 0
+        logger.info("round reset in %.1fms, %s enemies carried over", (time.perf_counter() - started) * 1000,
+                    len(self.enemies))
 
     def draw_level(self):
         offset = pyxel.frame_count // settings.scrollspeed
-        self.draw_csv('assets/Level_floor.csv', offset)
-        self.draw_csv('assets/Level_walls.csv', offset)
-        self.draw_csv('assets/Level_carpet.csv', offset)
-        self.draw_csv('assets/Level_objects.csv', offset)
-        self.draw_csv('assets/Level_objects2.csv', offset)
+        max_offset = self.level.max_offset(settings.level_view_cols)
+        if offset >= max_offset:
+            offset = max_offset
+            self.boss_fight = True
 
-    def update(self):
+        self.level_compositor.draw(offset)
+
+    def open_level(self):
+        return level.open_level(settings.level_layers, settings.level_file, settings.level_chunk_cols,
+                                settings.level_imagebank, settings.level_tile_size, LEVEL_TILESET)
+
+    def reload_level(self):
+        """ recompile and reopen the level if a layer csv or the tileset changed on disk """
+        if level.compiled_is_stale(settings.level_layers, settings.level_file, LEVEL_TILESET):
+            self.level.close()
+            self.level = self.open_level()
+            self.level_compositor.set_level(self.level)
+            return True
+        return False
+
+    def frame_time(self, frame_dt=None):
+        """ seconds since the last tick, or frame_dt when the caller drives the clock itself """
+        if frame_dt is None:
+            now = time.perf_counter()
+            frame_dt = 1 / settings.physics_hz if self.last_tick is None else now - self.last_tick
+            self.last_tick = now
+        return frame_dt
+
+    def step_physics(self, frame_dt=None):
+        """ run fixed size space steps for the time since the last tick.
+
+        Each step covers 1 / physics_hz seconds of real time and advances the space by space_dt,
+        steps beyond physics_max_steps in one tick are dropped rather than caught up. Pass frame_dt
+        to drive the clock yourself, e.g. headless runs faster than real time.
+        """
+        frame_dt = self.frame_time(frame_dt)
+        period = 1 / settings.physics_hz
+        self.physics_accumulator += min(frame_dt, settings.physics_max_frame_time)
+
+        # impulses go in before every step, zero space damping clears velocity after each one
+        pushes = [(player.body, player.impulse) for player in self.players.values() if player.impulse != (0, 0)]
+        pushes += entities.enemies.impulses()
+
+        steps = 0
+        while self.physics_accumulator >= period - 1e-9 and steps < settings.physics_max_steps:
+            for sprite in self.sprites():
+                sprite.store_position()
+            for body, impulse in pushes:
+                body.apply_impulse_at_local_point(impulse, (0, 0))
+            self.space.step(settings.space_dt)
+            self.physics_accumulator -= period
+            steps += 1
+        if steps == settings.physics_max_steps:
+            self.physics_accumulator = min(self.physics_accumulator, period)
+        self.alpha = min(max(self.physics_accumulator / period, 0.0), 1.0)
+        return steps
+
+    def sprites(self):
+        yield from self.players.values()
+        yield from self.enemies.values()
+
+    def update(self, frame_dt=None):
+        frame_dt = self.frame_time(frame_dt)
+        if self.recorder is not None:
+            self.recorder.begin_tick(pyxel.frame_count, frame_dt)
         if pyxel.btnp(pyxel.KEY_R):
-            logger.info("Exit.")
-            # pyxel.quit()
             self.reset()
         if pyxel.btnp(pyxel.KEY_B):
             self.boss_dead = True
             logger.debug("BOSS_FIGHT!")
         if pyxel.btnp(pyxel.KEY_Z):
             self.boss_fight = True
+        if settings.level_hot_reload:
+            # own counter, frame_count stays at 0 while waiting for enemies
+            self.level_poll_frames += 1
+            if self.level_poll_frames >= settings.level_reload_frames:
+                self.level_poll_frames = 0
+                self.reload_level()
 
-        self.flushingEnemies = True
-        enemies = self.new_enemies
-        self.new_enemies = []
-        self.flushingEnemies = False
+        self.apply_events()
 
-        for (sid, newEnemy) in enemies:
-            self.enemies[sid] = newEnemy
-            self.space.add(newEnemy.body,  newEnemy.poly)
         """ update game objects """
         objs_to_kill = []
+        debug = logger.isEnabledFor(logging.DEBUG)
         for player in self.players.values():
+            player.visible = player.on_screen()
             player.update(boss_dead=self.boss_dead)
             if player.dead:
                 pyxel.play(2, 2)
-                logger.debug(f"{player.id} is dead!")
+                logger.debug("%s is dead!", player.id)
                 objs_to_kill.append(player)
             elif player.death_frames > 0:
-                logger.debug(f"{player.id} is dying! {player.death_frames}")
+                if debug:
+                    logger.debug("%s is dying! %s", player.id, player.death_frames)
                 player.death_frames -= 1
                 if player.death_frames <= 0:
-                    logger.debug(f"{player.id} TRUE DEATH! {player.death_frames}")
+                    logger.debug("%s TRUE DEATH! %s", player.id, player.death_frames)
                     player.dead = True
             elif player.health <= 0:
                 player.death_frames = settings.death_duration
-        for enemy in self.enemies.values():
-            enemy.update()
-            if enemy.dead and isinstance(enemy, Boss):
-                pyxel.play(2, 2)
-                logger.debug(f"{enemy.id} is dead!")
-                objs_to_kill.append(enemy)
-            elif enemy.death_frames > 0:
-                logger.debug(f"{enemy.id} is dying! {enemy.death_frames}")
-                enemy.death_frames -= 1
-                if enemy.death_frames <= 0:
-                    logger.debug(f"{enemy.id} TRUE DEATH! {enemy.death_frames}")
-                    enemy.dead = True
-                    if isinstance(enemy, Boss):
-                        self.boss_dead = True
-            elif enemy.health <= 0:
-                enemy.death_frames = settings.death_duration
+        # enemies knocked off the canvas only refresh animation and controls every few ticks
+        interval = settings.offscreen_update_interval
+        for idx, enemy in enumerate(self.enemies.values()):
+            enemy.visible = enemy.on_screen()
+            if enemy.visible or (pyxel.frame_count + idx) % interval == 0:
+                enemy.update()
+        dead_bosses, boss_died = entities.enemies.tick_deaths(settings.death_duration)
+        if boss_died:
+            self.boss_dead = True
+        for enemy in dead_bosses:
+            pyxel.play(2, 2)
+            logger.debug("%s is dead!", enemy.id)
+            objs_to_kill.append(enemy)
 
         # if self.boss_added:
         #     logger.debug(f"boss has {self.boss.health} health!")
@@ -203,8 +362,15 @@ class Game:
 
         for obj in objs_to_kill:
             self.kill(obj)
+        profiler.frames.lap('sprites')
 
-        self.space.step(settings.space_dt)
+        self.step_physics(frame_dt)
+        self.apply_hits()
+        for player in self.players.values():
+            player.countdown_attack()
+        for enemy in entities.enemies.countdown_attacks():
+            enemy.poly.collision_type = COLLISION_ENEMY
+        profiler.frames.lap('space_step')
 
         if (len(self.enemies) < settings.required_enemies) and not self.running:
             pyxel.frame_count = 0
@@ -214,37 +380,58 @@ class Game:
 
     def draw(self):
         """ draw game to canvas """
-        pyxel.text(10, 5, "Granny Punch Up", 14)
-        pyxel.cls(0)
         self.draw_level()
-        for player in self.players.values():
-            player.draw()
-        for enemy in self.enemies.values():
-            enemy.draw()
-        """ GRANDAS  below """
-
-        granda_x = -6
-        if pyxel.frame_count % 2 == 0:
-            offset = 16
-        else:
-            offset = 0
-        pyxel.blt(granda_x, 46, 0, 112, 64 + offset, 16, 16, 0)
-        pyxel.blt(granda_x, 56, 0, 112, 64 + offset, 16, 16, 0)
-        pyxel.blt(granda_x, 66, 0, 112, 64 + offset, 16, 16, 0)
-        pyxel.blt(granda_x, 76, 0, 112, 64 + offset, 16, 16, 0)
-        pyxel.blt(granda_x, 86, 0, 112, 64 + offset, 16, 16, 0)
-        pyxel.blt(granda_x, 96, 0, 112, 64 + offset, 16, 16, 0)
-        pyxel.blt(granda_x, 106, 0, 112, 64 + offset, 16, 16, 0)
-        pyxel.blt(granda_x, 116, 0, 112, 64 + offset, 16, 16, 0)
-        pyxel.blt(granda_x, 126, 0, 112, 64 + offset, 16, 16, 0)
+        profiler.frames.lap('level_draw')
+        for sprite in self.sprites():
+            if sprite.visible:
+                sprite.draw(self.alpha)
+        profiler.frames.lap('sprite_draw')
+        self.grandad_wall.draw()
+        profiler.frames.lap('hud_draw')
 
     def handle_disconnect_event(self, sid):
+        self.events.put(events.DISCONNECT, sid)
+
+    def handle_connect_event(self, sid, data):
+        self.events.put(events.SPAWN, sid, data)
+
+    def handle_press_event(self, sid, buttonName):
+        self.events.put(events.PRESS, sid, buttonName)
+
+    def handle_release_event(self, sid, buttonName):
+        self.events.put(events.RELEASE, sid, buttonName)
+
+    def handle_input_event(self, sid, entries):
+        self.events.put(events.INPUT, sid, entries)
+
+    def apply_events(self):
+        """ apply everything the server thread queued since the last tick, runs on the game thread """
+        batch = self.events.drain()
+        if self.recorder is not None:
+            self.recorder.record_events(batch)
+        profiler.frames.lap('input')
+        for kind, sid, data, _ in batch:
+            if kind == events.SPAWN:
+                self.connect_enemy(sid, data)
+            elif kind == events.PRESS:
+                self.press_enemy(sid, data)
+            elif kind == events.RELEASE:
+                self.release_enemy(sid, data)
+            elif kind == events.INPUT:
+                self.input_enemy(sid, data)
+            elif kind == events.DISCONNECT:
+                self.disconnect_enemy(sid)
+            else:
+                logger.error("unknown event %s from %s, ignoring", kind, sid)
+        profiler.frames.lap('enemy_flush')
+
+    def disconnect_enemy(self, sid):
         if sid in self.enemies.keys():
             self.kill(self.enemies[sid])
 
-    def handle_connect_event(self, sid, data):
-        logger.debug(f"handling connect for {sid}")
-        if len(self.enemies.keys()) > settings.max_enemies:
+    def connect_enemy(self, sid, data):
+        logger.debug("handling connect for %s", sid)
+        if sid not in self.enemies and len(self.enemies) >= settings.max_enemies:
             logger.error('reached enemy limit, ignoring request')
         else:
             self.add_new_enemy(sid, data)
@@ -255,58 +442,44 @@ class Game:
     #     self.space.add(self.boss.body, self.boss.poly)
 
     def add_new_enemy(self, sid, data):
-        class_list = ["Baby", "Girl", "Woman", "Pregnant", "Boy", "Man", "Granda"]
-        if self.boss_fight:
-            enemy_class = "Boss"
-            logger.debug(f"SPAWNING BOSS")
-        else:
-            enemy_class = random.choice(class_list)
-
-        if enemy_class == "Enemy":
-            newEnemy = Enemy(sid, 100, 50, velocity=(0, 0))
-        elif enemy_class == "Baby":
-            newEnemy = Baby(sid, 100, 50, velocity=(0, 0))
-        elif enemy_class == "Girl":
-            newEnemy = Girl(sid, 100, 50, velocity=(0, 0))
-        elif enemy_class == "Woman":
-            newEnemy = Woman(sid, 100, 50, velocity=(0, 0))
-        elif enemy_class == "Pregnant":
-            newEnemy = Pregnant(sid, 100, 50, velocity=(0, 0))
-        elif enemy_class == "Boy":
-            newEnemy = Boy(sid, 100, 50, velocity=(0, 0))
-        elif enemy_class == "Man":
-            newEnemy = Man(sid, 100, 50, velocity=(0, 0))
-        elif enemy_class == "Granda":
-            newEnemy = Granda(sid, 100, 50, velocity=(0, 0))
-        elif enemy_class == "Boss":
-            newEnemy = Boss(sid, 100, 50, velocity=(0, 0))
-        else:
-            logger.error(f"add_new_enemy: could not find class {enemy_class}")
-            return False
-
-        # self.enemies[sid] = data
-        while self.flushingEnemies:
-            pass
-        self.new_enemies.append((sid, newEnemy))
-
-    def handle_press_event(self, sid, buttonName):
+        if sid in self.enemies:
+            self.kill(self.enemies[sid])  # a repeated ready replaces the old enemy
+        archetype = registry.choose(self.boss_fight)
+        if archetype is registry.boss:
+            logger.debug("SPAWNING BOSS")
+        newEnemy = pool.enemies.acquire(archetype, sid, *settings.enemy_spawn)
+
+        self.enemies[sid] = newEnemy
+        entities.enemies.active[newEnemy.slot] = True
+        self.space.add(newEnemy.body, newEnemy.poly)
+
+    def press_enemy(self, sid, buttonName):
         if sid not in self.enemies.keys():
-            logger.error(f"unrecognised press event from {sid}, ignoring")
+            logger.debug("unrecognised press event from %s, ignoring", sid)
             return
         self.enemies[sid].handlepress(buttonName)
 
-    def handle_release_event(self, sid, buttonName):
+    def release_enemy(self, sid, buttonName):
         if sid not in self.enemies.keys():
-            logger.error(f"unrecognised release event from {sid}, ignoring")
+            logger.debug("unrecognised release event from %s, ignoring", sid)
             return
         self.enemies[sid].handlerelease(buttonName)
 
+    def input_enemy(self, sid, entries):
+        if sid not in self.enemies.keys():
+            logger.debug("unrecognised input event from %s, ignoring", sid)
+            return
+        self.enemies[sid].apply_input(entries)
+
     def kill(self, obj):
-        logger.debug(f"game killing {obj.id}")
+        logger.debug("game killing %s", obj.id)
         obj.die()
         if isinstance(obj, Player):
             self.dead_grannys.append(obj)  # track player deaths
             del(self.players[obj.id])
+            self.space.remove(obj.body, obj.poly)
         elif isinstance(obj, Enemy):
             del(self.enemies[obj.id])
-        self.space.remove(obj.body)
+            entities.enemies.active[obj.slot] = False
+            self.space.remove(obj.body, obj.poly)
+            pool.enemies.release(obj)
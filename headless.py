@@ -0,0 +1,240 @@
+""" Headless, deterministic simulation of the game loop for profiling and benchmarks.
+
+    python headless.py --ticks 1000 --enemies 50 --seed 1 [--draw] [--allocs] [--contacts]
+    python headless.py --bench
+    python headless.py --ticks 1000 --enemies 50 --record session.bin
+    python headless.py --replay session.bin [--draw]
+
+Logs recorded by the live game (GRANNY_RECORD=session.bin) replay the same way.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchstats import percentile
+
+import nullpyxel
+sys.modules['pyxel'] = nullpyxel
+
+import events  # noqa: E402
+import game  # noqa: E402
+import logsetup  # noqa: E402
+import pool  # noqa: E402
+import protocol  # noqa: E402
+import recording  # noqa: E402
+import settings  # noqa: E402
+
+logsetup.configure()
+
+# the stand-in image banks are not the real tiles, so compile the level apart from the game's copy
+settings.level_file = os.path.join(tempfile.gettempdir(), "granny-headless-level.bin")
+
+BUTTONS = list(protocol.BUTTON_BITS)
+BENCH_ENEMIES = [1, 10, 50, 200]
+
+
+class ButtonScript:
+    """ Seeded random button streams for a fixed set of remote enemies.
+
+    With binary set, controllers use the binary protocol and send their changed states every
+    `batch` ticks instead of one press/release event per change.
+    """
+
+    def __init__(self, seed, enemies, press_chance=0.2, binary=False, batch=1):
+        self.rng = random.Random(seed)
+        self.sids = [f"bot-{n}" for n in range(enemies)]
+        self.held = {sid: set() for sid in self.sids}
+        self.press_chance = press_chance
+        self.binary = binary
+        self.batch = batch
+        self.seq = 0
+        self.unsent = {sid: [] for sid in self.sids}
+
+    def connect(self, sim):
+        for sid in self.sids:
+            sim.handle_connect_event(sid, {})
+
+    def step(self, sim, tick):
+        for sid in self.sids:
+            if self.rng.random() >= self.press_chance:
+                continue
+            button = self.rng.choice(BUTTONS)
+            if button in self.held[sid]:
+                self.held[sid].discard(button)
+                if not self.binary:
+                    sim.handle_release_event(sid, button)
+            else:
+                self.held[sid].add(button)
+                if not self.binary:
+                    sim.handle_press_event(sid, button)
+            if self.binary:
+                state = sum(protocol.BUTTON_BITS[held] for held in self.held[sid])
+                self.unsent[sid].append((self.seq, state))
+        self.seq += 1
+        if self.binary and self.seq % self.batch == 0:
+            for sid, entries in self.unsent.items():
+                if entries:
+                    sim.handle_input_event(sid, protocol.decode(protocol.encode(entries)))
+                    entries.clear()
+
+
+def simulate(ticks, enemies, seed=0, draw=False, allocs=False, press_chance=0.2, record=None, binary=False,
+             batch=1, contacts=False):
+    """ run Game.update() (and Game.draw() if asked) for a number of ticks, returns a report dict """
+    random.seed(seed)
+    nullpyxel.reset()
+    pool.enemies.clear()  # pooled bodies carry solver state over, start each run like a fresh process
+    recorder = recording.Recorder(record, seed=seed) if record else None
+    sim = game.Game(recorder=recorder)
+    script = ButtonScript(seed, enemies, press_chance, binary, batch)
+    script.connect(sim)
+
+    if allocs:
+        tracemalloc.start()
+    frame_dt = 1 / settings.fps
+    admitted = 0
+    contact_total = 0
+    untimed = 0.0  # spent counting contacts, left out of ticks/s
+    timings = []
+    start = time.perf_counter()
+    for tick in range(ticks):
+        script.step(sim, tick)
+        tick_start = time.perf_counter()
+        sim.update(frame_dt)
+        if draw:
+            sim.draw()
+        timings.append(time.perf_counter() - tick_start)
+        admitted = max(admitted, len(sim.enemies))
+        if contacts:
+            count_start = time.perf_counter()
+            contact_total += sim.contact_pairs()
+            untimed += time.perf_counter() - count_start
+        nullpyxel.frame_count += 1
+    elapsed = time.perf_counter() - start - untimed
+    shapes = len(sim.space.shapes)
+    sim.clear()
+    if recorder is not None:
+        recorder.close()
+
+    report = {"ticks": ticks,
+              "enemies": enemies,
+              "admitted": admitted,
+              "ticks_per_sec": ticks / elapsed,
+              "p50_ms": percentile(timings, 50) * 1000,
+              "p99_ms": percentile(timings, 99) * 1000,
+              "shapes": shapes}
+    if contacts:
+        report["contacts_per_tick"] = contact_total / ticks
+    if allocs:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report["alloc_current_kb"] = current / 1024
+        report["alloc_peak_kb"] = peak / 1024
+    return report
+
+
+def replay(path, draw=False, contacts=False):
+    """ feed a recorded input log back into a fresh Game as fast as possible, returns a report dict """
+    seed, keys, ticks = recording.read_log(path)
+    random.seed(seed)
+    nullpyxel.reset()
+    pool.enemies.clear()
+    sim = game.Game()
+    key_ids = [getattr(nullpyxel, name) for name in keys]
+
+    spawned = set()
+    admitted = 0
+    contact_total = 0
+    untimed = 0.0  # spent counting contacts, left out of ticks/s
+    timings = []
+    start = time.perf_counter()
+    for tick, frame_dt, held, pressed, batch in ticks:
+        nullpyxel.frame_count = tick
+        nullpyxel.pressed.clear()
+        nullpyxel.just_pressed.clear()
+        for bit, key in enumerate(key_ids):
+            if held >> bit & 1:
+                nullpyxel.pressed.add(key)
+            if pressed >> bit & 1:
+                nullpyxel.just_pressed.add(key)
+        for kind, sid, data in batch:
+            if kind == events.SPAWN:
+                spawned.add(sid)
+            sim.events.put(kind, sid, data)
+        tick_start = time.perf_counter()
+        sim.update(frame_dt)
+        if draw:
+            sim.draw()
+        timings.append(time.perf_counter() - tick_start)
+        admitted = max(admitted, len(sim.enemies))
+        if contacts:
+            count_start = time.perf_counter()
+            contact_total += sim.contact_pairs()
+            untimed += time.perf_counter() - count_start
+    elapsed = time.perf_counter() - start - untimed
+    shapes = len(sim.space.shapes)
+    sim.clear()
+
+    report = {"ticks": len(ticks),
+            "enemies": len(spawned),
+            "admitted": admitted,
+            "ticks_per_sec": len(ticks) / elapsed,
+            "p50_ms": percentile(timings, 50) * 1000,
+            "p99_ms": percentile(timings, 99) * 1000,
+            "shapes": shapes}
+    if contacts:
+        report["contacts_per_tick"] = contact_total / len(ticks)
+    return report
+
+
+def format_report(report):
+    line = ("{enemies:>4} enemies ({admitted} admitted): {ticks_per_sec:9.1f} ticks/s, "
+            "p50 {p50_ms:.3f}ms, p99 {p99_ms:.3f}ms, {shapes} shapes").format(**report)
+    if "contacts_per_tick" in report:
+        line += ", {contacts_per_tick:.1f} contacts/tick".format(**report)
+    if "alloc_peak_kb" in report:
+        line += ", allocs {alloc_current_kb:.1f}KB live, {alloc_peak_kb:.1f}KB peak".format(**report)
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--enemies", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--press-chance", type=float, default=0.2)
+    parser.add_argument("--draw", action="store_true", help="also call Game.draw() against the no-op renderer")
+    parser.add_argument("--allocs", action="store_true", help="trace allocations (slows the run down)")
+    parser.add_argument("--contacts", action="store_true",
+                        help="count touching shape pairs every tick, left out of ticks/s but not of --allocs")
+    parser.add_argument("--bench", action="store_true", help=f"run for {BENCH_ENEMIES} enemies")
+    parser.add_argument("--binary", action="store_true", help="controllers use the binary input protocol")
+    parser.add_argument("--batch", type=int, default=1, help="ticks per binary input packet")
+    parser.add_argument("--record", metavar="PATH", help="write the scripted input to an input log")
+    parser.add_argument("--replay", metavar="PATH", help="replay an input log instead of scripted input")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    logsetup.set_level(args.log_level)
+    if args.replay:
+        report = replay(args.replay, draw=args.draw, contacts=args.contacts)
+        print(f"replay of {args.replay}, {report['ticks']} ticks")
+        print(format_report(report))
+        return
+    if args.record and args.bench:
+        parser.error("--record takes a single run, not --bench")
+    counts = BENCH_ENEMIES if args.bench else [args.enemies]
+    print(f"max_enemies = {settings.max_enemies}, seed = {args.seed}, {args.ticks} ticks")
+    for enemies in counts:
+        report = simulate(args.ticks, enemies, seed=args.seed, draw=args.draw,
+                          allocs=args.allocs, press_chance=args.press_chance, record=args.record,
+                          binary=args.binary, batch=args.batch, contacts=args.contacts)
+        print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
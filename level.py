@@ -0,0 +1,307 @@
+""" Level data: csv layers, the compiled chunk format streamed at runtime, and the tilemap compositor.
+
+    python level.py    # recompile settings.level_file from settings.level_layers
+
+A compiled level is a header followed by fixed size chunks of chunk_cols columns, each holding every
+layer's rows as int16 tiles ([layer][row][column], the last chunk padded with EMPTY_TILE). Layers are
+flattened and blank tiles dropped at compile time, so the runtime only copies chunks into tilemaps.
+"""
+import array
+import csv
+import logging
+import logsetup
+import mmap
+import os
+import struct
+
+import pyxel
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+EMPTY_TILE = -1
+MAGIC = b"GPLV"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHIHI")  # magic, version, layers, height, width, chunk cols, chunk count
+
+
+class Level:
+    """ Tile layers of a level, parsed once from csv into compact arrays for compile_level """
+
+    def __init__(self, layer_files):
+        self.layer_files = layer_files
+        self.layers = []
+        self.width = 0
+        self.height = 0
+        self.load()
+
+    def load(self):
+        """ parse every layer csv into a list of array('h') rows """
+        layers = []
+        for layer_file in self.layer_files:
+            with open(layer_file) as csv_map:
+                layers.append([array.array('h', (int(value) for value in row))
+                               for row in csv.reader(csv_map, delimiter=',') if row])
+
+        self.layers = layers
+        self.height = max(len(rows) for rows in layers)
+        self.width = min(len(row) for rows in layers for row in rows)
+        logger.info("level loaded: %s layers, %sx%s tiles", len(layers), self.width, self.height)
+
+
+def blank_tiles(imagebank, tile_size, values):
+    """ tile indexes whose pixels are all the key colour """
+    image = pyxel.image(imagebank)
+    tiles_per_row = image.width // tile_size
+    blank = set()
+    for value in values:
+        u = (value % tiles_per_row) * tile_size
+        v = (value // tiles_per_row) * tile_size
+        if all(image.get(u + x, v + y) == 0 for y in range(tile_size) for x in range(tile_size)):
+            blank.add(value)
+    return blank
+
+
+def flatten(level, blank):
+    """ merge layers with no overlapping tiles, top layers stay on top, blank tiles become EMPTY_TILE """
+    width, height = level.width, level.height
+    flattened = []
+    for rows in level.layers:
+        layer = [array.array('h', (EMPTY_TILE if value in blank else value for value in row[:width]))
+                 for row in rows]
+        layer += [array.array('h', [EMPTY_TILE] * width) for _ in range(height - len(layer))]
+        if flattened and not any(value != EMPTY_TILE and below[x] != EMPTY_TILE
+                                 for row, below in zip(layer, flattened[-1])
+                                 for x, value in enumerate(row)):
+            for row, below in zip(layer, flattened[-1]):
+                for x, value in enumerate(row):
+                    if value != EMPTY_TILE:
+                        below[x] = value
+            continue
+        flattened.append(layer)
+    return [layer for layer in flattened if any(value != EMPTY_TILE for row in layer for value in row)]
+
+
+def compile_level(level, path, chunk_cols, imagebank, tile_size):
+    """ write a Level as a chunked level file, blank tiles are looked up in the loaded image bank """
+    used = set()
+    for rows in level.layers:
+        for row in rows:
+            used.update(row)
+    used.discard(EMPTY_TILE)
+    blank = blank_tiles(imagebank, tile_size, used)
+    blank.add(EMPTY_TILE)
+    layers = flatten(level, blank)
+
+    chunk_count = -(-level.width // chunk_cols)
+    padding = array.array('h', [EMPTY_TILE] * chunk_cols)
+    partial = path + ".partial"  # moved into place once complete, so an interrupted compile leaves path alone
+    try:
+        with open(partial, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(layers), level.height, level.width, chunk_cols, chunk_count))
+            for chunk in range(chunk_count):
+                start = chunk * chunk_cols
+                for layer in layers:
+                    for row in layer:
+                        tiles = row[start:start + chunk_cols]
+                        f.write(tiles.tobytes())
+                        f.write(padding[len(tiles):].tobytes())
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    logger.info("compiled %s: %s layers, %sx%s tiles, %s chunks", path, len(layers), level.width, level.height,
+                chunk_count)
+
+
+def read_header(path):
+    """ (layers, height, width, chunk cols, chunk count) of a compiled level, or None unless path is a
+    whole version VERSION level file """
+    try:
+        with open(path, "rb") as f:
+            prefix = f.read(HEADER.size)
+            size = os.fstat(f.fileno()).st_size
+    except OSError:
+        return None
+    if len(prefix) < HEADER.size:
+        return None
+    magic, version, layer_count, height, width, chunk_cols, chunk_count = HEADER.unpack(prefix)
+    if magic != MAGIC or version != VERSION:
+        return None
+    if size != HEADER.size + chunk_count * layer_count * height * chunk_cols * 2:
+        return None  # truncated
+    return layer_count, height, width, chunk_cols, chunk_count
+
+
+def compiled_is_stale(layer_files, path, tileset=None):
+    """ True if the compiled level is missing, unreadable, or older than any layer csv or the tileset
+    image its blank tiles were picked from """
+    if read_header(path) is None:
+        return True
+    compiled = os.stat(path).st_mtime
+    sources = list(layer_files) + ([tileset] if tileset else [])
+    return any(os.stat(source).st_mtime > compiled for source in sources if os.path.exists(source))
+
+
+def open_level(layer_files, path, chunk_cols, imagebank, tile_size, tileset=None):
+    """ the compiled level at path, recompiled from the layer csvs first if it is stale """
+    if compiled_is_stale(layer_files, path, tileset):
+        compile_level(Level(layer_files), path, chunk_cols, imagebank, tile_size)
+    return ChunkedLevel(path)
+
+
+class ChunkedLevel:
+    """ A compiled level memory-mapped from disk.
+
+    Chunks are decoded when first asked for and dropped again by retain(), so how much of the level
+    is held in memory depends on the streaming window, not on the level length.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.layer_count, self.height, self.width, self.chunk_cols, self.chunk_count = \
+            HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} compiled level")
+        self.chunk_bytes = self.layer_count * self.height * self.chunk_cols * 2
+        self.resident = {}
+        logger.info("level opened: %s layers, %sx%s tiles, %s chunks of %s columns", self.layer_count, self.width,
+                    self.height, self.chunk_count, self.chunk_cols)
+
+    def max_offset(self, view_cols):
+        return max(self.width - view_cols, 0)
+
+    def chunk_range(self, start_col, end_col):
+        """ indexes of the chunks holding columns start_col up to end_col """
+        return range(max(start_col, 0) // self.chunk_cols,
+                     min(-(-end_col // self.chunk_cols), self.chunk_count))
+
+    def chunk(self, idx):
+        """ [layer][row] array('h') of chunk_cols tiles """
+        rows = self.resident.get(idx)
+        if rows is None:
+            tiles = array.array('h')
+            start = HEADER.size + idx * self.chunk_bytes
+            tiles.frombytes(self.map[start:start + self.chunk_bytes])
+            cols = self.chunk_cols
+            rows = [[tiles[(layer * self.height + row) * cols:(layer * self.height + row + 1) * cols]
+                     for row in range(self.height)]
+                    for layer in range(self.layer_count)]
+            self.resident[idx] = rows
+        return rows
+
+    def prefetch(self, chunks):
+        """ ask the os to page in chunks that will be needed soon """
+        if chunks and hasattr(mmap, "MADV_WILLNEED"):
+            start = HEADER.size + chunks[0] * self.chunk_bytes
+            page_start = start - start % mmap.PAGESIZE
+            self.map.madvise(mmap.MADV_WILLNEED, page_start, start - page_start + len(chunks) * self.chunk_bytes)
+
+    def retain(self, chunks):
+        """ drop decoded chunks outside of chunks """
+        for idx in [idx for idx in self.resident if idx not in chunks]:
+            del self.resident[idx]
+
+    def close(self):
+        self.resident.clear()
+        self.map.close()
+        self.file.close()
+
+
+class LevelCompositor:
+    """ Streams a ChunkedLevel into pyxel tilemaps, a frame is one bltm per flattened layer.
+
+    The level is drawn from bands of tilemap width that start every tilemap width - view_cols
+    columns, so any visible window sits inside a single band. Band b lives in tilemap rows of slot
+    b % slots. Chunks the view is about to reach are copied into their band a few per frame, ahead of
+    the scroll offset, and only the chunks on screen are ever copied synchronously.
+    """
+
+    def __init__(self, level, imagebank, first_tilemap, view_cols, blank_tile, slots, prefetch_cols,
+                 writes_per_frame):
+        self.imagebank = imagebank
+        self.first_tilemap = first_tilemap
+        self.view_cols = view_cols
+        self.blank_tile = blank_tile
+        self.slots = slots
+        self.prefetch_cols = prefetch_cols
+        self.writes_per_frame = writes_per_frame
+        self.tilemap_cols = pyxel.tilemap(first_tilemap).width
+        self.band_stride = self.tilemap_cols - view_cols
+        self.set_level(level)
+
+    def set_level(self, level):
+        """ start streaming a (re)opened level, nothing written so far is reused """
+        if level.height * self.slots > pyxel.tilemap(self.first_tilemap).height:
+            raise ValueError(f"{self.slots} bands of a {level.height} row level do not fit in a tilemap")
+        self.level = level
+        self.tilemaps = list(range(self.first_tilemap, self.first_tilemap + level.layer_count))
+        for tilemap in self.tilemaps:
+            pyxel.tilemap(tilemap).refimg = self.imagebank
+        self.slot_bands = [None] * self.slots
+        self.written = [set() for _ in range(self.slots)]
+        self.prefetched = None
+
+    def _write(self, band, chunk):
+        """ copy the part of a chunk that falls inside a band into the band's slot """
+        slot = band % self.slots
+        if self.slot_bands[slot] != band:
+            self.slot_bands[slot] = band
+            self.written[slot].clear()
+        band_start = band * self.band_stride
+        chunk_start = chunk * self.level.chunk_cols
+        first = max(chunk_start, band_start)
+        last = min(chunk_start + self.level.chunk_cols, band_start + self.tilemap_cols)
+        blank = "{:03x}".format(self.blank_tile)
+        for tilemap, rows in zip(self.tilemaps, self.level.chunk(chunk)):
+            data = ["".join(blank if value == EMPTY_TILE else "{:03x}".format(value)
+                            for value in row[first - chunk_start:last - chunk_start])
+                    for row in rows]
+            pyxel.tilemap(tilemap).set(first - band_start, slot * self.level.height, data)
+        self.written[slot].add(chunk)
+
+    def _missing(self, band, start_col, end_col):
+        """ (band, chunk) pairs covering columns start_col to end_col of a band not yet in its slot """
+        band_start = band * self.band_stride
+        slot = band % self.slots
+        written = self.written[slot] if self.slot_bands[slot] == band else ()
+        chunks = self.level.chunk_range(max(start_col, band_start), min(end_col, band_start + self.tilemap_cols))
+        return [(band, chunk) for chunk in chunks if chunk not in written]
+
+    def stream(self, offset):
+        """ make the visible window drawable and copy a few chunks ahead of it """
+        band = offset // self.band_stride
+        for band_chunk in self._missing(band, offset, offset + self.view_cols):
+            self._write(*band_chunk)
+
+        ahead = offset + self.view_cols + self.prefetch_cols
+        pending = self._missing(band, offset, ahead) + self._missing(band + 1, offset, ahead)
+        for band_chunk in pending[:self.writes_per_frame]:
+            self._write(*band_chunk)
+
+        self.level.retain(self.level.chunk_range(offset, ahead))
+        upcoming = self.level.chunk_range(ahead, ahead + self.prefetch_cols)
+        if upcoming and upcoming.start != self.prefetched:
+            self.level.prefetch(upcoming)
+            self.prefetched = upcoming.start
+
+    def draw(self, offset):
+        self.stream(offset)
+        band = offset // self.band_stride
+        u = offset - band * self.band_stride
+        v = (band % self.slots) * self.level.height
+        for tilemap in self.tilemaps:
+            pyxel.bltm(0, 0, tilemap, u, v, self.view_cols, self.level.height, 0)
+
+
+if __name__ == "__main__":
+    import sys
+    import assets
+    import settings
+
+    pyxel.init(settings.canvas_x, settings.canvas_y)
+    assets.load_images()
+    compile_level(Level(settings.level_layers), sys.argv[1] if len(sys.argv) > 1 else settings.level_file,
+                  settings.level_chunk_cols, settings.level_imagebank, settings.level_tile_size)
@@ -0,0 +1,166 @@
+""" Load generator that plays N phone controllers against the socket.io server in main.py.
+
+    python loadtest.py --url http://localhost:8080 --clients 200 --rate 8 --duration 30
+
+Every client sends `ready` and then a random press/release stream at `rate` events per second,
+or with --binary the same button changes as binary protocol `input` packets of `batch` states.
+Each event is sent with an ack so its round trip is measured, events without an ack within
+`timeout` are counted as dropped. The server's `stats` event reports game tick intervals, which
+are sampled once a second for tick jitter, and the counters of events its rate limiter and
+backpressure dropped after acking them.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+
+import socketio
+
+import protocol
+from benchstats import percentile
+
+logger = logging.getLogger("loadtest")
+logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+
+BUTTONS = list(protocol.BUTTON_BITS)
+
+
+class Results:
+    def __init__(self):
+        self.round_trips = []
+        self.sent = 0
+        self.dropped = 0
+        self.failed_connects = 0
+        self.tick_intervals = []
+        self.max_enemies_seen = 0
+        self.limiter_first = None  # the server's limiter counters, from the first and last stats sample
+        self.limiter_last = None
+
+
+async def emit_timed(client, results, event, data, timeout):
+    results.sent += 1
+    start = time.perf_counter()
+    try:
+        await client.call(event, data, timeout=timeout)
+    except (socketio.exceptions.TimeoutError, socketio.exceptions.BadNamespaceError):
+        results.dropped += 1
+        return
+    results.round_trips.append(time.perf_counter() - start)
+
+
+async def run_client(num, args, results, deadline):
+    rng = random.Random(args.seed + num)
+    client = socketio.AsyncClient(reconnection=False)
+    try:
+        await client.connect(args.url)
+    except socketio.exceptions.ConnectionError as e:
+        logger.error(f"client {num} could not connect: {e}")
+        results.failed_connects += 1
+        return
+
+    held = set()
+    entries = []
+    seq = 0
+    try:
+        await emit_timed(client, results, 'ready', {}, args.timeout)
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(rng.expovariate(args.rate))
+            button = rng.choice(BUTTONS)
+            if button in held:
+                held.discard(button)
+                if not args.binary:
+                    await emit_timed(client, results, 'release', button, args.timeout)
+            else:
+                held.add(button)
+                if not args.binary:
+                    await emit_timed(client, results, 'press', button, args.timeout)
+            if args.binary:
+                entries.append((seq, sum(protocol.BUTTON_BITS[name] for name in held)))
+                seq += 1
+                if len(entries) >= args.batch:
+                    await emit_timed(client, results, 'input', protocol.encode(entries), args.timeout)
+                    entries.clear()
+    finally:
+        await client.disconnect()
+
+
+async def sample_ticks(args, results, deadline):
+    client = socketio.AsyncClient(reconnection=False)
+    await client.connect(args.url)
+    try:
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(1)
+            try:
+                stats = await client.call('stats', None, timeout=args.timeout)
+            except socketio.exceptions.TimeoutError:
+                logger.warning("stats request timed out")
+                continue
+            # one second of ticks per sample, so no interval is counted twice
+            results.tick_intervals.extend(stats["tick_intervals"][-args.fps:])
+            results.max_enemies_seen = max(results.max_enemies_seen, stats["enemies"])
+            if results.limiter_first is None:
+                results.limiter_first = stats["limiter"]
+            results.limiter_last = stats["limiter"]
+    finally:
+        await client.disconnect()
+
+
+async def run(args):
+    deadline = time.perf_counter() + args.ramp + args.duration
+    results = Results()
+    tasks = [asyncio.ensure_future(sample_ticks(args, results, deadline))]
+    for num in range(args.clients):
+        tasks.append(asyncio.ensure_future(run_client(num, args, results, deadline)))
+        if args.ramp:
+            await asyncio.sleep(args.ramp / args.clients)
+    await asyncio.gather(*tasks)
+    return results
+
+
+def report(args, results):
+    print(f"{args.clients} clients at {args.rate} events/s for {args.duration}s against {args.url}")
+    print(f"connect failures: {results.failed_connects}, enemies seen in game: {results.max_enemies_seen}")
+    print(f"events sent: {results.sent}, dropped: {results.dropped} "
+          f"({100 * results.dropped / max(results.sent, 1):.2f}%)")
+    if results.limiter_last:
+        # acked but never queued for the game, counted since the first sample
+        print("server limiter: " + ", ".join(
+            f"{name} {value if name == 'clients' else value - results.limiter_first[name]}"
+            for name, value in results.limiter_last.items()))
+    if results.round_trips:
+        print("round trip: p50 {:.1f}ms, p99 {:.1f}ms, max {:.1f}ms".format(
+            percentile(results.round_trips, 50) * 1000,
+            percentile(results.round_trips, 99) * 1000,
+            max(results.round_trips) * 1000))
+    if len(results.tick_intervals) > 1:
+        print("game tick: mean {:.1f}ms, jitter (stdev) {:.1f}ms, p99 {:.1f}ms, max {:.1f}ms".format(
+            statistics.mean(results.tick_intervals) * 1000,
+            statistics.stdev(results.tick_intervals) * 1000,
+            percentile(results.tick_intervals, 99) * 1000,
+            max(results.tick_intervals) * 1000))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=5.0, help="events per second per client")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of button mashing")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which clients connect")
+    parser.add_argument("--timeout", type=float, default=2.0, help="seconds before an event counts as dropped")
+    parser.add_argument("--fps", type=int, default=30, help="game frame rate, sizes the tick samples")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--binary", action="store_true", help="send binary protocol input packets")
+    parser.add_argument("--batch", type=int, default=1,
+                        help="button states per binary input packet, at most settings.input_max_entries")
+    args = parser.parse_args(argv)
+
+    results = asyncio.get_event_loop().run_until_complete(run(args))
+    report(args, results)
+
+
+if __name__ == "__main__":
+    main()
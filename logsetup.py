@@ -0,0 +1,50 @@
+""" Logging setup shared by every module.
+
+Records are handed to a QueueHandler and written to stdout by a listener thread, so terminal I/O
+never stalls a frame. The level comes from GRANNY_LOG_LEVEL or settings.log_level and can be changed
+at runtime. Per-frame messages are lazily formatted and guarded, so they cost next to nothing
+while DEBUG is off.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+import settings
+
+_listener = None
+
+
+def configure():
+    """ install the queue handler on the root logger, safe to call from every module """
+    global _listener
+    if _listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(os.environ.get("GRANNY_LOG_LEVEL", settings.log_level).upper())
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def set_level(level):
+    logging.getLogger().setLevel(level)
+
+
+def toggle_debug():
+    """ flip between DEBUG and the configured level """
+    root = logging.getLogger()
+    if root.level == logging.DEBUG:
+        root.setLevel(os.environ.get("GRANNY_LOG_LEVEL", settings.log_level).upper())
+        if root.level == logging.DEBUG:
+            root.setLevel(logging.INFO)
+    else:
+        root.setLevel(logging.DEBUG)
+    root.info("log level is now %s", logging.getLevelName(root.level))
@@ -1,19 +1,29 @@
+import profiler  # first, so startup timing covers the other imports
 import pyxel
 import sys
 import logging
+import logsetup
 import asyncio
+import os
 import threading
+import time
 from aiohttp import web
 import socketio
 
 
+import assets
+import events
 import game
 import title
 import menu
+import pool
+import protocol
+import ratelimit
+import recording
 import settings
 
 logger = logging.getLogger("main")
-logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)
+logsetup.configure()
 
 PALETTE = pyxel.DEFAULT_PALETTE
 sio = socketio.AsyncServer()
@@ -26,23 +36,66 @@ class App:
     def __init__(self):
         self.ctx = {"cur_frame": settings.starting_frame}
         pyxel.init(settings.canvas_x, settings.canvas_y,
-                   palette=PALETTE, scale=settings.scale)
+                   palette=PALETTE, scale=settings.scale, fps=settings.fps)
+
+        profiler.startup.mark('pyxel_init')
 
         pyxel.load('assets/granny.pyxel')
         pyxel.play(0, [0, 1], loop=True)
-
-        # initialize all frames
-        self.title = title.Title()
-        self.menu = menu.Menu()
-        self.game = game.Game()
+        assets.load_images()
+        profiler.startup.mark('assets')
+
+        record_path = os.environ.get("GRANNY_RECORD", settings.record_path)
+        self.recorder = recording.Recorder(record_path) if record_path else None
+        self.events = events.EventQueue()
+        self.rejected_input_packets = 0
+        self.limiter = ratelimit.ConnectionLimiter()
+        self.backpressure_drops = 0
+
+        # scenes are built the first time ctx['cur_frame'] switches to them
+        self.scene_factories = {'title': title.Title,
+                                'menu': menu.Menu,
+                                'game': lambda: game.Game(recorder=self.recorder, event_queue=self.events)}
+        self.scenes = {}
+        self.show_profiler = False
         logger.info("App initialized")
 
+    def scene(self, name):
+        """ the scene for a context frame, constructed on first use """
+        scene = self.scenes.get(name)
+        if scene is None:
+            if name not in self.scene_factories:
+                logging.error('invalid context frame %s', name)
+                sys.exit(1)
+            started = time.perf_counter()
+            scene = self.scenes[name] = self.scene_factories[name]()
+            logger.info("%s built in %.0fms", name, (time.perf_counter() - started) * 1000)
+            if profiler.startup.total is None:
+                profiler.startup.mark(name)
+        return scene
+
+    def enemy_count(self):
+        game_scene = self.scenes.get('game')
+        return len(game_scene.enemies) if game_scene is not None else 0
+
+    def backed_up(self):
+        """ True while the event queue is past event_queue_limit, counting the input dropped for it.
+
+        Checked before the limiter so a dropped event leaves its sid's tokens and held buttons alone.
+        Releases, spawns and disconnects are never dropped for backpressure, they are already bounded
+        by the limiter and losing one would leave a button stuck or a phone without an enemy.
+        """
+        if len(self.events) >= settings.event_queue_limit:
+            self.backpressure_drops += 1
+            return True
+        return False
 
     def run(self):
         pyxel.run(self.update, self.draw)
 
     def update(self):
         """ checks for quit signal, then calls update() for current frame """
+        profiler.frames.tick()
         if pyxel.btnp(pyxel.KEY_Q):
             pyxel.quit()
             logger.info("Exit.")
@@ -55,32 +108,24 @@ class App:
             self.ctx['cur_frame'] = 'game'
         if pyxel.btnp(pyxel.KEY_M):
             self.ctx['cur_frame'] = 'menu'
+        if pyxel.btnp(pyxel.KEY_L):
+            logsetup.toggle_debug()
+        if pyxel.btnp(pyxel.KEY_P):
+            self.show_profiler = not self.show_profiler
         if pyxel.btnp(pyxel.GAMEPAD_1_A):
             logger.debug("A PRESSED!")
         """ END DEBUG """
 
-        if self.ctx['cur_frame'] == 'game':
-            self.game.update()
-        elif self.ctx['cur_frame'] == 'menu':
-            self.menu.update()
-        elif self.ctx['cur_frame'] == 'title':
-            self.title.update()
-        else:
-            logging.error('invalid context frame %s' % self.ctx['cur_frame'])
-            sys.exit(1)
+        self.scene(self.ctx['cur_frame']).update()
 
     def draw(self):
         """ Calls draw() for current frame """
+        profiler.frames.restart()
         pyxel.cls(0)
-        if self.ctx['cur_frame'] == 'game':
-            self.game.draw()
-        elif self.ctx['cur_frame'] == 'menu':
-            self.menu.draw()
-        elif self.ctx['cur_frame'] == 'title':
-            self.title.draw()
-        else:
-            logging.error('invalid context frame %s' % self.ctx['cur_frame'])
-            sys.exit(1)
+        self.scene(self.ctx['cur_frame']).draw()
+        if self.show_profiler:
+            profiler.frames.draw_overlay()
+        profiler.startup.first_frame()
 
 
 pyxel_app = App()
@@ -93,30 +138,76 @@ pyxel_app = App()
 
 @sio.on('press')
 def on_press(sid, data):
-    pyxel_app.game.handle_press_event(sid, data)
+    if not pyxel_app.backed_up() and pyxel_app.limiter.press(sid, data):
+        pyxel_app.events.put(events.PRESS, sid, data)
 
 
 @sio.on('release')
 def on_release(sid, data):
-    pyxel_app.game.handle_release_event(sid, data)
+    if pyxel_app.limiter.release(sid, data):
+        pyxel_app.events.put(events.RELEASE, sid, data)
+
+
+@sio.on('input')
+def on_input(sid, data):
+    """ binary protocol controller states, see protocol.py """
+    try:
+        entries = protocol.decode(data)
+    except ValueError as e:
+        pyxel_app.rejected_input_packets += 1
+        logger.debug("rejected input packet from %s: %s", sid, e)
+        return
+    if not pyxel_app.backed_up() and pyxel_app.limiter.input(sid, entries):
+        pyxel_app.events.put(events.INPUT, sid, entries)
 
 
 @sio.on('ready')
 def on_ready(sid, data):
-    pyxel_app.game.handle_connect_event(sid, data)
+    if pyxel_app.limiter.ready(sid):
+        pyxel_app.events.put(events.SPAWN, sid, data)
+
 
 @sio.on('disconnect')
 def on_disconnect(sid):
-    pyxel_app.game.handle_disconnect_event(sid)
+    if pyxel_app.limiter.forget(sid):
+        pyxel_app.events.put(events.DISCONNECT, sid)
+
+
+@sio.on('stats')
+def on_stats(sid, data=None):
+    """ recent game tick intervals, used by loadtest.py to measure jitter """
+    return {"frame_count": pyxel.frame_count,
+            "enemies": pyxel_app.enemy_count(),
+            "queued_events": len(pyxel_app.events),
+            "limiter": dict(pyxel_app.limiter.stats(), backpressure=pyxel_app.backpressure_drops),
+            "tick_intervals": profiler.frames.tick_intervals()}
 
 
 def say_hello(request):
     return web.Response(text='Hello, world')
 
 
+def metrics(request):
+    queue = pyxel_app.events
+    gauges = {"frame_count": pyxel.frame_count,
+              "enemies": pyxel_app.enemy_count(),
+              "queued_events": len(queue),
+              "events_drained_total": queue.drained,
+              "events_coalesced_total": queue.coalesced,
+              "event_latency_seconds": f"{queue.latency:.6f}",
+              "startup_seconds": f"{profiler.startup.total or 0:.3f}",
+              "input_packets_rejected_total": pyxel_app.rejected_input_packets,
+              "events_backpressure_dropped_total": pyxel_app.backpressure_drops}
+    for name, value in pyxel_app.limiter.stats().items():
+        gauges[f"limiter_{name}" if name == "clients" else f"limiter_{name}_total"] = value
+    for name, value in pool.enemies.stats().items():
+        gauges[f"enemy_pool_{name}"] = value
+    return web.Response(text=profiler.frames.metrics(gauges))
+
+
 server_app = web.Application()
 sio.attach(server_app)
-server_app.add_routes([web.get('/', say_hello)])
+server_app.add_routes([web.get('/', say_hello), web.get('/metrics', metrics)])
 handler = server_app.make_handler()
 server = loop.create_server(handler, host='0.0.0.0', port=8080)
 
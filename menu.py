@@ -1,9 +1,9 @@
 import logging
-import sys
+import logsetup
 import pyxel
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)
+logsetup.configure()
 
 
 class Menu:
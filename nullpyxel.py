@@ -0,0 +1,129 @@
+""" No-op stand-in for the parts of the pyxel API the game uses, so the game can run without a window.
+
+Importing this module does not replace pyxel, headless.py installs it as sys.modules['pyxel'] before
+the game modules are imported. Drawing and sound calls do nothing, buttons read from `pressed`
+and `just_pressed`.
+"""
+DEFAULT_PALETTE = [0] * 16
+frame_count = 0
+pressed = set()
+just_pressed = set()
+_constants = {}
+
+
+def __getattr__(name):
+    """ KEY_*, GAMEPAD_* and MOUSE_* constants get a stable unique id on first use """
+    if name.startswith(('KEY_', 'GAMEPAD_', 'MOUSE_')):
+        return _constants.setdefault(name, len(_constants))
+    raise AttributeError(f"module {__name__} has no attribute {name}")
+
+
+class Image:
+    width = 256
+    height = 256
+
+    def load(self, x, y, filename):
+        pass
+
+    def get(self, x, y):
+        return 1  # every pixel opaque, so no tile counts as blank
+
+    def set(self, x, y, data):
+        pass
+
+
+class Tilemap:
+    width = 256
+    height = 256
+
+    def __init__(self):
+        self.refimg = 0
+
+    def get(self, x, y):
+        return 0
+
+    def set(self, x, y, data):
+        pass
+
+
+_images = [Image() for _ in range(4)]
+_tilemaps = [Tilemap() for _ in range(8)]
+
+
+def reset():
+    global frame_count
+    frame_count = 0
+    pressed.clear()
+    just_pressed.clear()
+
+
+def init(*args, **kwargs):
+    pass
+
+
+def load(filename):
+    pass
+
+
+def run(update, draw):
+    global frame_count
+    while True:
+        update()
+        draw()
+        frame_count += 1
+
+
+def quit():
+    pass
+
+
+def image(img):
+    return _images[img]
+
+
+def tilemap(tm):
+    return _tilemaps[tm]
+
+
+def btn(key):
+    return key in pressed
+
+
+def btnp(key):
+    return key in just_pressed
+
+
+def btnr(key):
+    return False
+
+
+def play(ch, snd, loop=False):
+    pass
+
+
+def stop(ch=None):
+    pass
+
+
+def cls(col):
+    pass
+
+
+def blt(x, y, img, u, v, w, h, colkey=None):
+    pass
+
+
+def bltm(x, y, tm, u, v, w, h, colkey=None):
+    pass
+
+
+def rect(x1, y1, x2, y2, col):
+    pass
+
+
+def rectb(x1, y1, x2, y2, col):
+    pass
+
+
+def text(x, y, s, col):
+    pass
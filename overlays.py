@@ -0,0 +1,72 @@
+import logging
+import logsetup
+
+import pyxel
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+
+class DrawList:
+    """ pyxel draw calls recorded once as (function, args) commands and replayed in one call.
+
+    For overlays that draw the same thing every frame, e.g. a baked strip. Replaying costs a python
+    loop per frame, so it only pays off once the commands replace more expensive drawing. Recording
+    methods return the list so a whole overlay can be built in one expression.
+    """
+
+    def __init__(self):
+        self.commands = []
+
+    def blt(self, x, y, img, u, v, w, h, colkey=None):
+        self.commands.append((pyxel.blt, (x, y, img, u, v, w, h, colkey)))
+        return self
+
+    def rect(self, x1, y1, x2, y2, col):
+        self.commands.append((pyxel.rect, (x1, y1, x2, y2, col)))
+        return self
+
+    def text(self, x, y, s, col):
+        self.commands.append((pyxel.text, (x, y, s, col)))
+        return self
+
+    def replay(self):
+        for draw, args in self.commands:
+            draw(*args)
+
+
+class PhasedOverlay:
+    """ one DrawList per animation phase, the phase is picked from pyxel.frame_count """
+
+    def __init__(self, phases, frames_per_phase=1):
+        self.phases = phases
+        self.frames_per_phase = frames_per_phase
+
+    def draw(self):
+        self.phases[(pyxel.frame_count // self.frames_per_phase) % len(self.phases)].replay()
+
+
+def bake_strip(blts, imagebank, u, v, colkey):
+    """ composite (x, y, img, u, v, w, h) blts into one strip of an image bank, at (u, v).
+
+    The strip covers the bounding box of the blts. Pixels of colkey are skipped the way blt skips them,
+    so overlapping sprites stack as if they were drawn one by one. Returns a DrawList that draws the
+    whole strip back at the blts' screen position with a single blt.
+    """
+    left = min(x for x, y, *_ in blts)
+    top = min(y for x, y, *_ in blts)
+    width = max(x + w for x, y, img, src_u, src_v, w, h in blts) - left
+    height = max(y + h for x, y, img, src_u, src_v, w, h in blts) - top
+
+    strip = pyxel.image(imagebank)
+    for row in range(height):
+        strip.set(u, v + row, [f"{colkey:x}" * width])
+    for x, y, img, src_u, src_v, w, h in blts:
+        source = pyxel.image(img)
+        for dy in range(h):
+            for dx in range(w):
+                col = source.get(src_u + dx, src_v + dy)
+                if col != colkey:
+                    strip.set(u + x - left + dx, v + y - top + dy, col)
+    logger.debug("baked %s blts into a %sx%s strip of image %s at %s, %s", len(blts), width, height, imagebank, u, v)
+    return DrawList().blt(left, top, imagebank, u, v, width, height, colkey)
@@ -0,0 +1,41 @@
+import logging
+import logsetup
+
+import pymunk
+
+import settings
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+
+def make_space(threaded=settings.space_threaded, threads=settings.space_threads,
+               iterations=settings.space_iterations, spatial_hash=settings.space_spatial_hash,
+               hash_dim=settings.space_hash_dim, hash_count=settings.space_hash_count):
+    """ a pymunk space configured from settings.space_*.
+
+    A spatial hash sized to the sprites suits a crowd of same sized circles better than the default
+    bounding box tree, threads only apply to a threaded space (pymunk supports at most 2).
+    """
+    space = pymunk.Space(threaded=threaded)
+    if threaded:
+        space.threads = threads
+    space.iterations = iterations
+    space.damping = settings.space_damping
+    if spatial_hash:
+        space.use_spatial_hash(hash_dim, hash_count)
+    return space
+
+
+def boundary_shapes(body):
+    """ the level edges as one rounded box per wall band plus the left wall.
+
+    A box of radius r is exactly the union of the stack of r-thick segments the edges used to be
+    built from, so bodies touching an edge get one contact instead of dozens.
+    """
+    radius = settings.boundary_radius
+    shapes = []
+    for (x0, y0), (x1, y1) in settings.boundary_boxes:
+        shapes.append(pymunk.Poly(body, [(x0, y0), (x1, y0), (x1, y1), (x0, y1)], radius=radius))
+    shapes.append(pymunk.Segment(body, *settings.boundary_left_wall, radius))
+    return shapes
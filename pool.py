@@ -0,0 +1,58 @@
+import logging
+import logsetup
+
+import entities
+import settings
+from archetypes import registry
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+
+class EnemyPool:
+    """ Free list of enemies detached from the space, reused for new connections.
+
+    Enemies keep their pymunk body and shape while pooled, so join/leave churn does not allocate.
+    """
+
+    def __init__(self, max_free):
+        self.max_free = max_free
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+        self.released = 0
+        self.discarded = 0
+
+    def acquire(self, archetype, sid, xpos, ypos):
+        if self.free:
+            self.hits += 1
+            enemy = self.free.pop()
+            registry.respawn(enemy, archetype, sid, xpos, ypos)
+            return enemy
+        self.misses += 1
+        return registry.create(archetype, sid, xpos, ypos)
+
+    def release(self, enemy):
+        """ take back an enemy that has already been removed from the space """
+        if len(self.free) >= self.max_free:
+            self.discarded += 1
+            entities.enemies.free(enemy.slot)
+            return
+        self.released += 1
+        self.free.append(enemy)
+
+    def clear(self):
+        """ drop every pooled enemy and give back its store slot """
+        for enemy in self.free:
+            entities.enemies.free(enemy.slot)
+        self.free.clear()
+
+    def stats(self):
+        return {"free": len(self.free),
+                "hits": self.hits,
+                "misses": self.misses,
+                "released": self.released,
+                "discarded": self.discarded}
+
+
+enemies = EnemyPool(settings.enemy_pool_max_free)
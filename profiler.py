@@ -0,0 +1,119 @@
+import collections
+import logging
+import logsetup
+import time
+
+import pyxel
+
+import settings
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+PHASES = ('input', 'enemy_flush', 'sprites', 'space_step', 'level_draw', 'sprite_draw', 'hud_draw')
+
+
+class FrameProfiler:
+    """ Per-phase frame timings, kept in ring buffers of the last `history` frames.
+
+    tick() starts a frame at the top of App.update, restart() resumes timing at the top of App.draw,
+    and lap(phase) charges the time since the previous mark to that phase.
+    """
+
+    def __init__(self, history):
+        self.phases = {phase: collections.deque(maxlen=history) for phase in PHASES}
+        self.tick_times = collections.deque(maxlen=history)
+        self._frame = dict.fromkeys(PHASES, 0.0)
+        self._last = 0.0
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.tick_times:
+            for phase, spent in self._frame.items():
+                self.phases[phase].append(spent)
+                self._frame[phase] = 0.0
+        self.tick_times.append(now)
+        self._last = now
+
+    def restart(self):
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self._frame[phase] += now - self._last
+        self._last = now
+
+    def tick_intervals(self):
+        tick_times = list(self.tick_times)
+        return [b - a for a, b in zip(tick_times, tick_times[1:])]
+
+    def summary(self):
+        """ {phase: (mean, max)} in seconds over the ring buffer """
+        summary = {}
+        for phase, timings in self.phases.items():
+            timings = list(timings)
+            if timings:
+                summary[phase] = (sum(timings) / len(timings), max(timings))
+            else:
+                summary[phase] = (0.0, 0.0)
+        return summary
+
+    def metrics(self, gauges=None):
+        """ prometheus text exposition of the phase timings plus any extra gauges """
+        lines = ["# TYPE granny_phase_seconds gauge"]
+        for phase, (mean, peak) in self.summary().items():
+            lines.append(f'granny_phase_seconds{{phase="{phase}",stat="mean"}} {mean:.6f}')
+            lines.append(f'granny_phase_seconds{{phase="{phase}",stat="max"}} {peak:.6f}')
+        intervals = self.tick_intervals()
+        if intervals:
+            lines.append("# TYPE granny_tick_interval_seconds gauge")
+            lines.append(f'granny_tick_interval_seconds{{stat="mean"}} {sum(intervals) / len(intervals):.6f}')
+            lines.append(f'granny_tick_interval_seconds{{stat="max"}} {max(intervals):.6f}')
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE granny_{name} gauge")
+            lines.append(f"granny_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def draw_overlay(self, x=2, y=2):
+        """ mean/max ms per phase against the frame budget """
+        budget = 1000 / settings.fps
+        total = 0.0
+        pyxel.rect(x - 1, y - 1, x + 92, y + 6 * (len(PHASES) + 1), 1)
+        for phase, (mean, peak) in self.summary().items():
+            total += mean
+            pyxel.text(x, y, f"{phase:<11}{mean * 1000:5.2f}{peak * 1000:6.2f}", 7)
+            y += 6
+        pyxel.text(x, y, f"{'total':<11}{total * 1000:5.2f}/{budget:.1f}", 8 if total * 1000 > budget else 11)
+
+
+class StartupClock:
+    """ Time from import to the first drawn frame, split at named marks """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+        self.total = None
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+    def first_frame(self):
+        """ called from the first App.draw, logs the breakdown once """
+        if self.total is not None:
+            return
+        self.mark('first_frame')
+        self.total = self.marks[-1][1] - self.start
+        last = self.start
+        steps = []
+        for name, at in self.marks:
+            steps.append(f"{name} {(at - last) * 1000:.0f}ms")
+            last = at
+        if self.total > settings.startup_target:
+            logger.warning("startup took %.2fs, over the %.1fs target: %s", self.total, settings.startup_target,
+                           ", ".join(steps))
+        else:
+            logger.info("startup took %.2fs: %s", self.total, ", ".join(steps))
+
+
+frames = FrameProfiler(settings.tick_history)
+startup = StartupClock()
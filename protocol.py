@@ -0,0 +1,56 @@
+""" Compact binary controller protocol, sent as the socket.io `input` event alongside the legacy
+`press`/`release` events.
+
+A packet is a version byte and an entry count, followed by that many entries of a u16 sequence
+number and a u8 button bitmask, little endian, oldest first. Each entry is the whole controller
+state at one client tick, so a client may batch several ticks into one packet and a lost or
+reordered packet never leaves a button stuck.
+
+    version u8, count u8, (seq u16, buttons u8) * count
+
+Sequence numbers wrap at 2**16, entries not newer than the last one applied for a sid are stale.
+This module has no game imports, so controller clients can use it as is.
+"""
+import struct
+
+VERSION = 1
+HEADER = struct.Struct("<BB")
+ENTRY = struct.Struct("<HB")
+MAX_ENTRIES = 255
+SEQ_MODULO = 1 << 16
+
+# wire bits, also the bits of an enemy's button state
+BUTTON_UP = 1
+BUTTON_DOWN = 2
+BUTTON_LEFT = 4
+BUTTON_RIGHT = 8
+BUTTON_A = 16
+BUTTON_B = 32
+BUTTONS = BUTTON_UP | BUTTON_DOWN | BUTTON_LEFT | BUTTON_RIGHT | BUTTON_A | BUTTON_B
+BUTTON_BITS = {'up': BUTTON_UP, 'down': BUTTON_DOWN, 'left': BUTTON_LEFT, 'right': BUTTON_RIGHT,
+               'a': BUTTON_A, 'b': BUTTON_B}
+
+
+def encode(entries):
+    """ packet for a list of (seq, buttons) entries, oldest first """
+    if len(entries) > MAX_ENTRIES:
+        raise ValueError(f"at most {MAX_ENTRIES} entries per packet")
+    return HEADER.pack(VERSION, len(entries)) + b"".join(ENTRY.pack(seq % SEQ_MODULO, buttons)
+                                                         for seq, buttons in entries)
+
+
+def decode(packet):
+    """ [(seq, buttons)] from a packet, raises ValueError for anything malformed """
+    if not isinstance(packet, (bytes, bytearray)) or len(packet) < HEADER.size:
+        raise ValueError("not an input packet")
+    version, count = HEADER.unpack_from(packet, 0)
+    if version != VERSION:
+        raise ValueError(f"unsupported input protocol version {version}")
+    if len(packet) != HEADER.size + count * ENTRY.size:
+        raise ValueError(f"input packet of {len(packet)} bytes does not hold {count} entries")
+    return [(seq, buttons & BUTTONS) for seq, buttons in ENTRY.iter_unpack(packet[HEADER.size:])]
+
+
+def newer(seq, last):
+    """ True if seq comes after last, allowing for wraparound """
+    return 0 < (seq - last) % SEQ_MODULO < SEQ_MODULO // 2
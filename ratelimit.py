@@ -0,0 +1,133 @@
+""" Per-connection rate limiting and admission control for the socket.io handlers in main.py.
+
+Every admitted sid gets a token bucket refilled at settings.input_rate tokens a second up to
+settings.input_burst. Presses and binary input entries cost a token each and a ready costs
+settings.ready_cost, so a phone can mash freely but cannot flood the event queue. Events the
+bucket cannot pay for are dropped, which is safe because a press is repeated by the next one and
+a binary input packet carries the whole controller state. Releases are free but only pass for a
+button whose press got through, so they never outnumber presses and never get a button stuck.
+
+Everything here runs on the server thread, Game only ever sees the events that were let through.
+"""
+import logging
+import logsetup
+import time
+
+import events
+import protocol
+import settings
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "stamp", "held")
+
+    def __init__(self, burst, now):
+        self.tokens = burst
+        self.stamp = now
+        self.held = set()  # buttons whose press was let through and not yet released
+
+
+class ConnectionLimiter:
+    """ token buckets for admitted sids, with counters of what was let through and why not """
+
+    def __init__(self, rate=settings.input_rate, burst=settings.input_burst, ready_cost=settings.ready_cost,
+                 max_entries=settings.input_max_entries, max_clients=settings.max_enemies, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.ready_cost = ready_cost
+        self.max_entries = max_entries
+        self.max_clients = max_clients
+        self.clock = clock
+        self.buckets = {}
+        self.allowed = 0
+        self.dropped = 0  # over the sid's rate
+        self.coalesced = 0  # repeated presses and releases that would change nothing
+        self.unknown = 0  # input from a sid that was never admitted
+        self.rejected = 0  # ready refused because max_clients sids are admitted, or a malformed event
+
+    def _take(self, bucket, cost):
+        now = self.clock()
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.stamp) * self.rate)
+        bucket.stamp = now
+        if bucket.tokens < cost:
+            self.dropped += 1
+            return False
+        bucket.tokens -= cost
+        self.allowed += 1
+        return True
+
+    def _bucket(self, sid):
+        bucket = self.buckets.get(sid)
+        if bucket is None:
+            self.unknown += 1
+        return bucket
+
+    def _button(self, button):
+        """ True for a button name protocol.BUTTON_BITS knows, anything else a phone sends is rejected """
+        if isinstance(button, str) and button in protocol.BUTTON_BITS:
+            return True
+        self.rejected += 1
+        return False
+
+    def ready(self, sid):
+        """ admit a new sid while there is room, a repeated ready from an admitted sid is rate limited """
+        bucket = self.buckets.get(sid)
+        if bucket is None:
+            if len(self.buckets) >= self.max_clients:
+                self.rejected += 1
+                logger.debug("refused ready from %s, %s clients admitted", sid, len(self.buckets))
+                return False
+            bucket = self.buckets[sid] = TokenBucket(self.burst, self.clock())
+        if not self._take(bucket, self.ready_cost):
+            return False
+        bucket.held.clear()  # the respawned enemy starts with nothing held
+        return True
+
+    def press(self, sid, button):
+        bucket = self._bucket(sid)
+        if bucket is None or not self._button(button):
+            return False
+        if button in bucket.held:
+            self.coalesced += 1
+            return False
+        if not self._take(bucket, 1):
+            return False
+        if button not in events.ACTION_BUTTONS:
+            bucket.held.add(button)
+        return True
+
+    def release(self, sid, button):
+        bucket = self._bucket(sid)
+        if bucket is None or not self._button(button):
+            return False
+        if button not in bucket.held:
+            self.coalesced += 1
+            return False
+        bucket.held.discard(button)
+        self.allowed += 1
+        return True
+
+    def input(self, sid, entries):
+        """ a binary input packet costs a token per entry, Enemy.apply_input walks every one of them """
+        bucket = self._bucket(sid)
+        if bucket is None:
+            return False
+        if len(entries) > self.max_entries:
+            self.rejected += 1
+            return False
+        return self._take(bucket, max(len(entries), 1))
+
+    def forget(self, sid):
+        """ free a disconnected sid's slot, True if it had been admitted """
+        return self.buckets.pop(sid, None) is not None
+
+    def stats(self):
+        return {"clients": len(self.buckets),
+                "allowed": self.allowed,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "unknown": self.unknown,
+                "rejected": self.rejected}
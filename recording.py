@@ -0,0 +1,185 @@
+""" Binary input logs of a game session, for replaying it headlessly at full speed.
+
+A log starts with a header holding the random seed and the names of the recorded pyxel keys,
+followed by one record per Game.update:
+
+    tick u32, frame_dt f64, held keys u32 bitmask, keys pressed this frame u32 bitmask, event count u32
+    per event: kind u8, data format u8, sid string id u32, data string id u32
+
+Strings (sids and encoded event data) are interned, the first use of an id is followed by its u32
+length and utf-8 bytes, later uses are the id alone. The data format says how the data string
+decodes: json, base64 for bytes, or the repr of anything json cannot hold, which replays as that
+string. Events without data have no data string, binary protocol inputs store their entry count in
+place of the data id and their entries, as in protocol.py, after the sid.
+"""
+import atexit
+import base64
+import json
+import logging
+import logsetup
+import random
+import struct
+
+import pyxel
+
+import events
+import protocol
+import sprites
+
+logger = logging.getLogger(__name__)
+logsetup.configure()
+
+MAGIC = b"GPRL"
+VERSION = 2
+HEADER = struct.Struct("<4sHQH")
+TICK = struct.Struct("<IdIII")
+EVENT = struct.Struct("<BBII")
+LENGTH = struct.Struct("<I")
+
+# data formats
+DATA_NONE = 0
+DATA_JSON = 1
+DATA_BYTES = 2
+DATA_REPR = 3
+DATA_ENTRIES = 4
+
+KINDS = (events.SPAWN, events.PRESS, events.RELEASE, events.DISCONNECT, events.INPUT)
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+# every pyxel key Game.update and Player.update read, 32 of them so held and pressed fit a u32
+KEYS = tuple(dict.fromkeys([f"KEY_{name}" for _, name in sprites.PLAYER_CONTROLS]
+                           + [f"GAMEPAD_{num}_{name}" for num in sprites.PLAYER_NUMS for _, name in sprites.PLAYER_CONTROLS]
+                           + ["KEY_R", "KEY_Z"]))
+
+
+class Recorder:
+    """ Writes every tick's drained controller events and local key state to a log file.
+
+    Seeds `random` on creation, so create it before the Game it records.
+    """
+
+    def __init__(self, path, seed=None, keys=KEYS):
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        random.seed(self.seed)
+        self.keys = [(1 << bit, getattr(pyxel, name)) for bit, name in enumerate(keys)]
+        self.strings = {}
+        self.ticks = 0
+        self.pending = None
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.seed, len(keys)))
+        for name in keys:
+            encoded = name.encode("ascii")
+            self.file.write(bytes((len(encoded),)) + encoded)
+        atexit.register(self.close)
+        logger.info("recording input to %s, seed %s", path, self.seed)
+
+    def begin_tick(self, tick, frame_dt):
+        """ sample local keys at the top of Game.update """
+        held = pressed = 0
+        for bit, key in self.keys:
+            if pyxel.btn(key):
+                held |= bit
+            if pyxel.btnp(key):
+                pressed |= bit
+        self.pending = (tick, frame_dt, held, pressed)
+
+    def record_events(self, batch):
+        """ write the tick begun by begin_tick with the events Game.apply_events drained """
+        if self.pending is None or self.file.closed:
+            return
+        out = [TICK.pack(*self.pending, len(batch))]
+        for kind, sid, data, _ in batch:
+            sid_id, sid_new = self._intern(str(sid))
+            if kind == events.INPUT:
+                data_format = DATA_ENTRIES
+                data_id, data_new = len(data), b"".join(protocol.ENTRY.pack(*entry) for entry in data)
+            elif data is None:
+                data_format, data_id, data_new = DATA_NONE, 0, b""
+            else:
+                data_format, text = encode_data(data)
+                data_id, data_new = self._intern(text)
+            out.append(EVENT.pack(KIND_CODES[kind], data_format, sid_id, data_id))
+            out.append(sid_new)
+            out.append(data_new)
+        self.file.write(b"".join(out))
+        self.pending = None
+        self.ticks += 1
+
+    def _intern(self, string):
+        """ (string id, bytes to write after the event) """
+        string_id = self.strings.get(string)
+        if string_id is not None:
+            return string_id, b""
+        string_id = self.strings[string] = len(self.strings)
+        encoded = string.encode("utf-8")
+        return string_id, LENGTH.pack(len(encoded)) + encoded
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            logger.info("recorded %s ticks", self.ticks)
+
+
+def encode_data(data):
+    """ (data format, string) for an event's data, whatever a phone sent """
+    try:
+        return DATA_JSON, json.dumps(data)
+    except (TypeError, ValueError):
+        pass
+    if isinstance(data, (bytes, bytearray)):
+        return DATA_BYTES, base64.b64encode(data).decode("ascii")
+    return DATA_REPR, repr(data)
+
+
+def decode_data(data_format, text):
+    if data_format == DATA_JSON:
+        return json.loads(text)
+    if data_format == DATA_BYTES:
+        return base64.b64decode(text)
+    return text  # DATA_REPR
+
+
+def read_log(path):
+    """ (seed, key names, list of (tick, frame_dt, held, pressed, events)) from a recorded log """
+    with open(path, "rb") as f:
+        buf = f.read()
+    magic, version, seed, key_count = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} input log")
+    offset = HEADER.size
+    keys = []
+    for _ in range(key_count):
+        length = buf[offset]
+        keys.append(buf[offset + 1:offset + 1 + length].decode("ascii"))
+        offset += 1 + length
+
+    strings = []
+
+    def string(string_id):
+        nonlocal offset
+        if string_id == len(strings):
+            length, = LENGTH.unpack_from(buf, offset)
+            offset += LENGTH.size
+            strings.append(buf[offset:offset + length].decode("utf-8"))
+            offset += length
+        return strings[string_id]
+
+    ticks = []
+    while offset < len(buf):
+        tick, frame_dt, held, pressed, count = TICK.unpack_from(buf, offset)
+        offset += TICK.size
+        batch = []
+        for _ in range(count):
+            code, data_format, sid_id, data_id = EVENT.unpack_from(buf, offset)
+            offset += EVENT.size
+            sid = string(sid_id)
+            if data_format == DATA_ENTRIES:
+                data = list(protocol.ENTRY.iter_unpack(buf[offset:offset + data_id * protocol.ENTRY.size]))
+                offset += data_id * protocol.ENTRY.size
+            elif data_format == DATA_NONE:
+                data = None
+            else:
+                data = decode_data(data_format, string(data_id))
+            batch.append((KINDS[code], sid, data))
+        ticks.append((tick, frame_dt, held, pressed, batch))
+    return seed, keys, ticks
@@ -4,6 +4,11 @@ canvas_y = 144
 space_dt = 0.02
 scale = 6
 max_enemies = 50
+input_rate = 20  # tokens a second per controller, see ratelimit.py
+input_burst = 40
+input_max_entries = 16  # binary input packets with more entries are rejected, see protocol.py
+ready_cost = 10  # tokens a repeated ready takes, so respawn spam is throttled harder than presses
+event_queue_limit = 2000  # queued events past which the server drops controller input
 space_damping = 0.0
 sprite_anim_modulo = 8
 scrollspeed = 4
@@ -21,3 +26,71 @@ death_duration = 60
 det_wall_dmg = 0.5
 player_max_health = 2000
 boss_max_health = 300
+
+asset_bundle = "assets/bundle.bin"  # built by python assets.py
+asset_images = ((0, "assets/villagers-export.png"),
+                (1, "assets/16X16-export.png"),
+                (2, "assets/Title-export.png"))
+startup_target = 3.0  # seconds from launch to the first frame, warned about when exceeded
+level_layers = ["assets/Level_floor.csv",
+                "assets/Level_walls.csv",
+                "assets/Level_carpet.csv",
+                "assets/Level_objects.csv",
+                "assets/Level_objects2.csv"]
+level_file = "assets/level.bin"  # compiled from level_layers by python level.py, or on startup if stale
+level_chunk_cols = 32
+level_stream_slots = 2  # tilemap bands kept, the one on screen and the next
+level_prefetch_cols = 64  # columns past the view copied into tilemaps ahead of the scroll
+level_chunk_writes_per_frame = 1
+level_imagebank = 1
+level_tile_size = 8
+level_view_cols = 32
+level_hot_reload = False  # recompile the level mid-game when a csv changes, for editing, stalls the frame
+level_reload_frames = 30
+level_first_tilemap = 0
+level_blank_tile = 0
+tick_history = 600
+log_level = "INFO"
+record_path = None  # input log for headless.py --replay, GRANNY_RECORD overrides
+fps = 30
+physics_hz = 30
+physics_max_steps = 4
+physics_max_frame_time = 0.25
+offscreen_update_interval = 4
+
+# name, spritesheet position, attack sprite position, attack power, veldiff, max health, radius
+enemy_archetypes = [
+    ("Baby", (48, 32), (128, 64), enemy_attack_power - 3, enemy_veldiff + 120, 100, 8),
+    ("Girl", (16, 64), (128, 32), enemy_attack_power, enemy_veldiff + 70, 100, 8),
+    ("Woman", (32, 64), (128, 48), enemy_attack_power + 2, enemy_veldiff + 70, 100, 8),
+    ("Pregnant", (64, 64), (128, 80), enemy_attack_power + 5, enemy_veldiff - 30, 100, 8),
+    ("Boy", (80, 64), (128, 96), enemy_attack_power - 1, enemy_veldiff + 100, 100, 8),
+    ("Man", (96, 64), (128, 112), enemy_attack_power + 3, enemy_veldiff + 50, 100, 8),
+    ("Granda", (112, 64), (128, 128), enemy_attack_power + 3, enemy_veldiff + 50, 100, 8),
+    ("Boss", (128, 0), (64, 64), boss_attack_power, enemy_veldiff + 150, boss_max_health, 8),
+]
+boss_archetype = "Boss"
+enemy_pool_max_free = 64
+enemy_spawn = (100, 50)
+reset_keeps_enemies = True  # connected enemies carry over into the next round
+
+# static level boundaries: rounded boxes (min corner, max corner) and a left wall segment
+boundary_boxes = [((0, 0), (255, 40)), ((0, 158), (255, 165))]
+boundary_left_wall = ((-25, 0), (-25, 144))
+boundary_radius = 30
+
+# pymunk space tuning, see bench_space.py
+space_threaded = True
+space_threads = 1
+space_iterations = 10
+space_spatial_hash = True
+space_hash_dim = 32
+space_hash_count = 1000
+
+# grandad wall at the left edge, baked into image bank strips below the title art
+grandad_wall_x = -6
+grandad_wall_ys = tuple(range(46, 127, 10))
+grandad_sprite = (112, 64)
+grandad_frame_offsets = (16, 0)  # v offset of the sprite on even and odd frames
+grandad_strip_bank = 2
+grandad_strips = ((0, 128), (16, 128))
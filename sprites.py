@@ -1,16 +1,50 @@
 import logging
-import sys
+import logsetup
 import pymunk
 import pyxel
 import random
 import settings
 
+import entities
+import protocol
+from entities import slot_field
+from protocol import BUTTON_UP, BUTTON_DOWN, BUTTON_LEFT, BUTTON_RIGHT, BUTTON_A, BUTTON_B
+
 logger = logging.getLogger(__name__)
-logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)
+logsetup.configure()
+
+COLLISION_PLAYER = 1
+COLLISION_ENEMY = 2
+COLLISION_WALL = 3
+COLLISION_DEATH_WALL = 4
+COLLISION_ENEMY_ATTACKING = 5  # an enemy while attack_frames > 0, only these pairs of enemies reach python
+
+# control bit and pyxel key name of each player control, read from KEY_<name> and GAMEPAD_<player_num>_<name>
+PLAYER_CONTROLS = ((BUTTON_UP, "UP"), (BUTTON_DOWN, "DOWN"), (BUTTON_RIGHT, "RIGHT"),
+                   (BUTTON_LEFT, "LEFT"), (BUTTON_A, "A"), (BUTTON_B, "B"))
+PLAYER_NUMS = (1, 2, 3, 4)
+
+
+def render_field(name):
+    """ plain attribute stored under _name, writing it marks the sprite's cached draw arguments dirty """
+    attr = '_' + name
+
+    def getter(self):
+        return getattr(self, attr)
+
+    def setter(self, value):
+        setattr(self, attr, value)
+        self.render_dirty = True
+    return property(getter, setter)
 
 
 class Sprite:
     """ Base Sprite clas. """
+    __slots__ = ('id', 'xpos0', 'ypos0', 'imagebank', 'spritesheet_positions', 'width', 'height',
+                 'spritesheet_keycol', 'mass', 'momentum', 'body', 'poly', 'prev_position', 'impulse',
+                 'attack_sprite_position', 'equipped', 'visible', 'player_num', 'attack_length', 'attack_power',
+                 'render_args')
+
     def __init__(self,
                  id, xpos, ypos,
                  imagebank, spritesheet_positions, attack_sprite_position, width, height, spritesheet_keycol,
@@ -31,6 +65,8 @@ class Sprite:
         self.body.position = self.xpos0, self.ypos0
         self.body.velocity = velocity
         self.body.spriteid = id
+        self.prev_position = self.body.position
+        self.impulse = (0, 0)
         self.spritesheet_idx = 0
         self.attack_frames = 0
         self.attack_sprite_position = attack_sprite_position
@@ -39,77 +75,95 @@ class Sprite:
         self.equipped = 'nothing'
         self.death_frames = 0
         self.dead = False
+        self.visible = True
+        self.boss = False
+        self.render_args = None
+        self.render_dirty = True
+
     def die(self):
         """ for later animation use, should be overloaded """
         pass
 
+    def store_position(self):
+        self.prev_position = self.body.position
+
+    def render_position(self, alpha):
+        """ position interpolated between the last two space steps """
+        prev, cur = self.prev_position, self.body.position
+        return prev.x + (cur.x - prev.x) * alpha, prev.y + (cur.y - prev.y) * alpha
+
     def is_attacking(self):
         if self.attack_frames > 0:
             return True
         return False
 
-    def draw(self):
-        if self.dead:
-            return  # to be deleted in next frame
-
-        if self.body.velocity != (0, 0):
-            logger.debug("{0} at {1}, {2} travelling at {2}".format(self.id,
-                                                                    self.body.position.x,
-                                                                    self.body.position.y,
-                                                                    self.body.velocity))
+    def countdown_attack(self):
         if self.is_attacking():
-            logger.debug(f"{self.id} is attacking [{self.attack_frames}]")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s is attacking [%s]", self.id, self.attack_frames)
             self.attack_frames -= 1
 
+    def on_screen(self):
+        """ True if the sprite or its health bar overlaps the canvas """
+        x, y = self.body.position
+        return x + self.width > 0 and x < settings.canvas_x and y + self.height > 0 and y - 1 < settings.canvas_y
+
+    def render_params(self):
+        """ (u, v, w, h, health bar width, health bar colour), no bar while dying """
         width = self.width
         if self.facing == 'left':
             width *= -1
-        s_position = self.spritesheet_positions[self.spritesheet_idx]
+        u, v = self.spritesheet_positions[self.spritesheet_idx]
 
         if self.death_frames > 0:
-            logger.debug(f"dead drawing {self.id}: {self.death_frames}: {self.dead}")
-            pyxel.blt(self.body.position.x,
-                      self.body.position.y,
-                      self.imagebank,
-                      s_position[0],
-                      s_position[1],
-                      width,
-                      -self.height,
-                      self.spritesheet_keycol)
-
-            return
-        if self.is_attacking() and not isinstance(self, Boss):
-            logger.debug(f"drawing attack frame for {self.id}")
-            s_position = (self.attack_sprite_position[0], self.attack_sprite_position[1])
-
-        pyxel.blt(self.body.position.x,
-                  self.body.position.y,
-                  self.imagebank,
-                  s_position[0],
-                  s_position[1],
-                  width,
-                  self.height,
-                  self.spritesheet_keycol)
-
-        if (self.health / self.max_health) > 0.7:
-            rect_col = 11
-        elif (self.health / self.max_health) > 0.4:
-            rect_col = 9
-        else:
-            rect_col = 8
+            return u, v, width, -self.height, None, None
+        if self.is_attacking() and not self.boss:
+            u, v = self.attack_sprite_position
+        ratio, rect_col = self.health_bar()
+        return u, v, width, self.height, self.width * ratio, rect_col
+
+    def draw(self, alpha=1.0):
+        if self.dead:
+            return  # to be deleted in next frame
 
-        pyxel.rect(self.body.position.x,
-                   self.body.position.y - 1,
-                   self.body.position.x + ((self.width / self.max_health) * self.health),
-                   self.body.position.y,
-                   rect_col)
+        if logger.isEnabledFor(logging.DEBUG) and self.body.velocity != (0, 0):
+            logger.debug("%s at %s, %s travelling at %s", self.id,
+                         self.body.position.x, self.body.position.y, self.body.velocity)
+
+        if self.render_dirty:
+            self.render_args = self.render_params()
+            self.render_dirty = False
+        u, v, width, height, bar_width, bar_col = self.render_args
+
+        x, y = self.render_position(alpha)
+        pyxel.blt(x, y, self.imagebank, u, v, width, height, self.spritesheet_keycol)
+        if bar_width is not None:
+            pyxel.rect(x, y - 1, x + bar_width, y, bar_col)
+
+    def health_bar(self):
+        """ (fraction of health left, bar colour) """
+        ratio = self.health / self.max_health
+        if ratio > 0.7:
+            return ratio, 11
+        elif ratio > 0.4:
+            return ratio, 9
+        return ratio, 8
 
     def useitem(self):
-        logger.info(f"{self.id} uses {self.equipped}!")
+        logger.info("%s uses %s!", self.id, self.equipped)
 
 
 class Player(Sprite):
     """ Gamepad player class """
+    __slots__ = ('_health', 'max_health', '_attack_frames', '_death_frames', 'dead', 'boss', '_facing',
+                 '_spritesheet_idx', 'veldiff', 'controls', 'render_dirty')
+
+    health = render_field('health')
+    attack_frames = render_field('attack_frames')
+    death_frames = render_field('death_frames')
+    facing = render_field('facing')
+    spritesheet_idx = render_field('spritesheet_idx')
+
     def __init__(self, id, xpos, ypos, imagebank=0,
                  spritesheet_positions=[(0, 0)], attack_sprite_position=(0, 0), width=16, height=16,
                  spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1, max_health=settings.player_max_health):
@@ -118,12 +172,15 @@ class Player(Sprite):
                          spritesheet_keycol, mass, momentum, velocity, max_health)
 
         self.poly = pymunk.Circle(self.body, (self.width / 4), offset=(0, 0))
-        self.poly.collision_type = 1
+        self.poly.collision_type = COLLISION_PLAYER
         self.player_num = player_num
         self.facing = 'right'
         self.attack_length = settings.player_attack_length
         self.attack_power = settings.player_attack_power
         self.veldiff = settings.player_veldiff
+        # keyboard and gamepad button for each control bit, resolved once
+        self.controls = tuple((bit, getattr(pyxel, f"KEY_{name}"), getattr(pyxel, f"GAMEPAD_{player_num}_{name}"))
+                              for bit, name in PLAYER_CONTROLS)
 
         dpos_x = self.spritesheet_positions[0][0] + self.width  # TODO: fix for where they really are!
         dpos_y = self.spritesheet_positions[0][1]  # TODO: fix for where they really are!
@@ -139,86 +196,173 @@ class Player(Sprite):
         self.attack_sprite_position = (attack_anim_x, attack_anim_y)
 
     def update(self, boss_dead):
-        num = self.player_num
         if pyxel.frame_count % settings.sprite_anim_modulo == 0:
             if self.spritesheet_idx == (len(self.spritesheet_positions) - 1):
                 self.spritesheet_idx = 0
             else:
                 self.spritesheet_idx += 1
 
-        if pyxel.btn(pyxel.KEY_UP) or pyxel.btn(getattr(pyxel, f"GAMEPAD_{num}_UP")):
-            self.body.apply_impulse_at_local_point((0, - self.veldiff), (0, 0))
-        if pyxel.btn(pyxel.KEY_DOWN) or pyxel.btn(getattr(pyxel, f"GAMEPAD_{num}_DOWN")):
-            self.body.apply_impulse_at_local_point((0, self.veldiff), (0, 0))
-        if pyxel.btn(pyxel.KEY_RIGHT) or pyxel.btn(getattr(pyxel, f"GAMEPAD_{num}_RIGHT")) or boss_dead:
+        buttons = BUTTON_RIGHT if boss_dead else 0
+        for bit, key, gamepad_button in self.controls:
+            if pyxel.btn(key) or pyxel.btn(gamepad_button):
+                buttons |= bit
+
+        if buttons & BUTTON_RIGHT:
             self.facing = 'right'
-            self.body.apply_impulse_at_local_point((self.veldiff, 0), (0, 0))
-        if pyxel.btn(pyxel.KEY_LEFT) or pyxel.btn(getattr(pyxel, f"GAMEPAD_{num}_LEFT")):
+        if buttons & BUTTON_LEFT:
             self.facing = 'left'
-            self.body.apply_impulse_at_local_point((-self.veldiff, 0), (0, 0))
-        if pyxel.btn(pyxel.KEY_A) or pyxel.btn(getattr(pyxel, f"GAMEPAD_{num}_A")):
+        direction_x, direction_y = entities.DIRECTION_TUPLES[buttons & entities.DIRECTION_MASK]
+        self.impulse = (direction_x * self.veldiff, direction_y * self.veldiff)
+        if buttons & BUTTON_A:
             self.attack_frames = self.attack_length
-        if pyxel.btn(pyxel.KEY_B) or pyxel.btn(getattr(pyxel, f"GAMEPAD_{num}_B")):
+        if buttons & BUTTON_B:
             self.useitem()
 
 
 class Enemy(Sprite):
-    """ Gamepad player class """
+    """ Gamepad player class, per-tick state lives in a slot of entities.enemies """
+    __slots__ = ('slot', 'kind', 'input_seq')
+
+    health = slot_field('health', renders=True)
+    max_health = slot_field('max_health', renders=True)
+    death_frames = slot_field('death_frames', renders=True)
+    dead = slot_field('dead')
+    boss = slot_field('boss', renders=True)
+    spritesheet_idx = slot_field('spritesheet_idx', renders=True)
+    buttons = slot_field('buttons')
+    veldiff = slot_field('veldiff')
+    render_dirty = slot_field('render_dirty')
+
+    @property
+    def attack_frames(self):
+        return entities.enemies.attack_frames.item(self.slot)
+
+    @attack_frames.setter
+    def attack_frames(self, value):
+        entities.enemies.attack_frames[self.slot] = value
+        entities.enemies.render_dirty[self.slot] = True
+        if self.poly is not None:
+            self.poly.collision_type = COLLISION_ENEMY_ATTACKING if value > 0 else COLLISION_ENEMY
+
+    @property
+    def facing(self):
+        return entities.FACINGS[entities.enemies.facing.item(self.slot)]
+
+    @facing.setter
+    def facing(self, value):
+        entities.enemies.facing[self.slot] = entities.FACINGS.index(value)
+        entities.enemies.render_dirty[self.slot] = True
+
     def __init__(self, id, xpos, ypos, imagebank=0,
                  spritesheet_positions=[(64, 64)], attack_sprite_position=(64, 64), width=16, height=16,
-                 spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1, max_health=100):
+                 spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1, max_health=100,
+                 attack_power=settings.enemy_attack_power, veldiff=settings.enemy_veldiff, radius=None,
+                 boss=False, kind="Enemy"):
         # spritesheet_ypos = spritesheet_ypos + ((player_num - 1) * height)
+        self.slot = entities.enemies.allocate(self)
+        self.poly = None
         super().__init__(id, xpos, ypos, imagebank, spritesheet_positions, attack_sprite_position, width, height,
                          spritesheet_keycol, mass, momentum, velocity, max_health)
 
-        self.poly = pymunk.Circle(self.body, (self.width / 2), offset=(0, 0))
-        self.poly.collision_type = 1
+        if radius is None:
+            radius = self.width / 2
+        self.poly = pymunk.Circle(self.body, radius, offset=(0, 0))
+        self.poly.collision_type = COLLISION_ENEMY
         self.player_num = player_num
-        self.facing = 'left'
-        self.attack_power = settings.enemy_attack_power
         self.attack_length = settings.enemy_attack_length
-        self.btn_ctx = {'up': False, 'down': False, 'left': False, 'right': False, 'a': False, 'b': False}
-        self.veldiff = settings.enemy_veldiff
-        if not isinstance(self, Boss):
+        self.set_archetype(spritesheet_positions, attack_power, veldiff, boss, kind)
+
+        # dpos_x = self.spritesheet_positions[0][0] + self.width  # TODO: fix for where they really are!
+        # dpos_y = self.spritesheet_positions[0][1]  # TODO: fix for where they really are!
+
+        # self.attack_sprite_position = self.spritesheet_positions[0]
+
+    def set_archetype(self, spritesheet_positions, attack_power, veldiff, boss, kind):
+        self.input_seq = None
+        self.render_dirty = True
+        self.facing = 'left'
+        self.kind = kind
+        self.boss = boss
+        self.attack_power = attack_power
+        self.buttons = 0
+        self.veldiff = veldiff
+        if not boss:
             self.spritesheet_positions = [(spritesheet_positions[0][0],
                                            random.randrange(0, 6) * 32)]
         else:
-            self.spritesheet_positions = [(128, 0)]
+            self.spritesheet_positions = [spritesheet_positions[0]]
+            self.attack_frames = pymunk.inf
 
         # add 2nd walking animation
         walk_anim_2_y = self.spritesheet_positions[0][1] + self.height
         walk_anim_2_x = self.spritesheet_positions[0][0]
         self.spritesheet_positions.append((walk_anim_2_x, walk_anim_2_y))
 
-        # dpos_x = self.spritesheet_positions[0][0] + self.width  # TODO: fix for where they really are!
-        # dpos_y = self.spritesheet_positions[0][1]  # TODO: fix for where they really are!
+    def respawn(self, id, xpos, ypos, spritesheet_positions, attack_sprite_position, max_health,
+                attack_power, veldiff, radius, boss, kind):
+        """ reset a pooled enemy, detached from the space, for a new connection """
+        self.id = id
+        self.xpos0 = xpos
+        self.ypos0 = ypos
+        self.body.spriteid = id
+        self.body.position = xpos, ypos
+        self.body.velocity = (0, 0)
+        self.body.angular_velocity = 0
+        self.body.angle = 0
+        self.prev_position = self.body.position
+        if self.poly.radius != radius:
+            self.poly.unsafe_set_radius(radius)
+        self.spritesheet_idx = 0
+        self.attack_frames = 0
+        self.attack_sprite_position = attack_sprite_position
+        self.max_health = max_health
+        self.health = max_health
+        self.death_frames = 0
+        self.dead = False
+        self.visible = True
+        self.set_archetype(spritesheet_positions, attack_power, veldiff, boss, kind)
 
-        # self.attack_sprite_position = self.spritesheet_positions[0]
     def update(self):
         if pyxel.frame_count % settings.sprite_anim_modulo == 0:
             if self.spritesheet_idx == (len(self.spritesheet_positions) - 1):
                 self.spritesheet_idx = 0
             else:
                 self.spritesheet_idx += 1
-        if self.btn_ctx['up']:
-            self.body.apply_impulse_at_local_point((0, -self.veldiff), (0, 0))
-        if self.btn_ctx['down']:
-            self.body.apply_impulse_at_local_point((0, self.veldiff), (0, 0))
-        if self.btn_ctx['right']:
-            self.body.apply_impulse_at_local_point((self.veldiff, 0), (0, 0))
-        if self.btn_ctx['left']:
-            self.body.apply_impulse_at_local_point((-self.veldiff, 0), (0, 0))
+
+    def apply_input(self, entries):
+        """ controller states from the binary protocol, oldest first, stale entries are skipped.
+
+        Directions follow the newest state, A and B act on the entries where they go down.
+        """
+        buttons = self.buttons
+        last_seq = self.input_seq
+        for seq, state in entries:
+            if last_seq is not None and not protocol.newer(seq, last_seq):
+                continue
+            pressed = state & ~buttons
+            if pressed & BUTTON_LEFT:
+                self.facing = 'left'
+            elif pressed & BUTTON_RIGHT:
+                self.facing = 'right'
+            if pressed & BUTTON_A:
+                self.attack_frames = self.attack_length
+            if pressed & BUTTON_B:
+                self.useitem()
+            buttons = state
+            last_seq = seq
+        self.buttons = buttons
+        self.input_seq = last_seq
 
     def handlepress(self, buttonName):
         if buttonName == 'up':
-            self.btn_ctx['up'] = True
+            self.buttons |= BUTTON_UP
         elif buttonName == 'down':
-            self.btn_ctx['down'] = True
+            self.buttons |= BUTTON_DOWN
         elif buttonName == 'right':
-            self.btn_ctx['right'] = True
+            self.buttons |= BUTTON_RIGHT
             self.facing = 'right'
         elif buttonName == 'left':
-            self.btn_ctx['left'] = True
+            self.buttons |= BUTTON_LEFT
             self.facing = 'left'
         elif buttonName == 'a':
             self.attack_frames = self.attack_length
@@ -227,157 +371,12 @@ class Enemy(Sprite):
 
     def handlerelease(self, buttonName):
         if buttonName == 'up':
-            self.btn_ctx['up'] = False
+            self.buttons &= ~BUTTON_UP
         elif buttonName == 'down':
-            self.btn_ctx['down'] = False
+            self.buttons &= ~BUTTON_DOWN
         elif buttonName == 'right':
-            self.btn_ctx['right'] = False
+            self.buttons &= ~BUTTON_RIGHT
             self.facing = 'right'
         elif buttonName == 'left':
-            self.btn_ctx['left'] = False
+            self.buttons &= ~BUTTON_LEFT
             self.facing = 'left'
-
-
-class Baby(Enemy):
-    """ Gamepad player class """
-    def __init__(self, id, xpos, ypos, imagebank=0,
-                 spritesheet_positions=[(48, 32)], attack_sprite_position=(128, 64), width=16,
-                 height=16, spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1):
-        super().__init__(id, xpos, ypos, imagebank, spritesheet_positions, attack_sprite_position, width, height,
-                         spritesheet_keycol, mass, momentum, velocity)
-
-        self.poly = pymunk.Circle(self.body, (self.width / 2), offset=(0, 0))
-        self.poly.collision_type = 1
-        self.player_num = player_num
-        self.facing = 'left'
-        self.attack_power = settings.enemy_attack_power - 3
-        self.attack_length = settings.enemy_attack_length
-        self.btn_ctx = {'up': False, 'down': False, 'left': False, 'right': False, 'a': False, 'b': False}
-        self.veldiff = settings.enemy_veldiff + 120
-
-
-class Girl(Enemy):
-    """ Gamepad player class """
-    def __init__(self, id, xpos, ypos, imagebank=0,
-                 spritesheet_positions=[(16, 64)], attack_sprite_position=(128, 32), width=16, height=16,
-                 spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1):
-        super().__init__(id, xpos, ypos, imagebank, spritesheet_positions, attack_sprite_position, width, height,
-                         spritesheet_keycol, mass, momentum, velocity)
-
-        self.poly = pymunk.Circle(self.body, (self.width / 2), offset=(0, 0))
-        self.poly.collision_type = 1
-        self.player_num = player_num
-        self.facing = 'left'
-        self.attack_power = settings.enemy_attack_power
-        self.attack_length = settings.enemy_attack_length
-        self.btn_ctx = {'up': False, 'down': False, 'left': False, 'right': False, 'a': False, 'b': False}
-        self.veldiff = settings.enemy_veldiff + 70
-
-
-class Woman(Enemy):
-    """ Gamepad player class """
-    def __init__(self, id, xpos, ypos, imagebank=0,
-                 spritesheet_positions=[(32, 64)], attack_sprite_position=(128, 48), width=16, height=16,
-                 spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1):
-        super().__init__(id, xpos, ypos, imagebank, spritesheet_positions, attack_sprite_position, width, height,
-                         spritesheet_keycol, mass, momentum, velocity)
-
-        self.poly = pymunk.Circle(self.body, (self.width / 2), offset=(0, 0))
-        self.poly.collision_type = 1
-        self.player_num = player_num
-        self.facing = 'left'
-        self.attack_power = settings.enemy_attack_power + 2
-        self.attack_length = settings.enemy_attack_length
-        self.btn_ctx = {'up': False, 'down': False, 'left': False, 'right': False, 'a': False, 'b': False}
-        self.veldiff = settings.enemy_veldiff + 70
-
-
-class Pregnant(Enemy):
-    """ Gamepad player class """
-    def __init__(self, id, xpos, ypos, imagebank=0,
-                 spritesheet_positions=[(64, 64)], attack_sprite_position=(128, 80), width=16, height=16,
-                 spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1):
-        super().__init__(id, xpos, ypos, imagebank, spritesheet_positions, attack_sprite_position, width, height,
-                         spritesheet_keycol, mass, momentum, velocity)
-
-        self.poly = pymunk.Circle(self.body, (self.width / 2), offset=(0, 0))
-        self.poly.collision_type = 1
-        self.player_num = player_num
-        self.facing = 'left'
-        self.attack_power = settings.enemy_attack_power + 5
-        self.attack_length = settings.enemy_attack_length
-        self.btn_ctx = {'up': False, 'down': False, 'left': False, 'right': False, 'a': False, 'b': False}
-        self.veldiff = settings.enemy_veldiff - 30
-
-
-class Boy(Enemy):
-    """ Gamepad player class """
-    def __init__(self, id, xpos, ypos, imagebank=0,
-                 spritesheet_positions=[(80, 64)], attack_sprite_position=(128, 96), width=16, height=16,
-                 spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1):
-        super().__init__(id, xpos, ypos, imagebank, spritesheet_positions, attack_sprite_position, width, height,
-                         spritesheet_keycol, mass, momentum, velocity)
-
-        self.poly = pymunk.Circle(self.body, (self.width / 2), offset=(0, 0))
-        self.poly.collision_type = 1
-        self.player_num = player_num
-        self.facing = 'left'
-        self.attack_power = settings.enemy_attack_power - 1
-        self.attack_length = settings.enemy_attack_length
-        self.btn_ctx = {'up': False, 'down': False, 'left': False, 'right': False, 'a': False, 'b': False}
-        self.veldiff = settings.enemy_veldiff + 100
-
-
-class Man(Enemy):
-    """ Gamepad player class """
-    def __init__(self, id, xpos, ypos, imagebank=0,
-                 spritesheet_positions=[(96, 64)], attack_sprite_position=(128, 112), width=16, height=16,
-                 spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1):
-        super().__init__(id, xpos, ypos, imagebank, spritesheet_positions, attack_sprite_position, width, height,
-                         spritesheet_keycol, mass, momentum, velocity)
-
-        self.poly = pymunk.Circle(self.body, (self.width / 2), offset=(0, 0))
-        self.poly.collision_type = 1
-        self.player_num = player_num
-        self.facing = 'left'
-        self.attack_power = settings.enemy_attack_power + 3
-        self.attack_length = settings.enemy_attack_length
-        self.btn_ctx = {'up': False, 'down': False, 'left': False, 'right': False, 'a': False, 'b': False}
-        self.veldiff = settings.enemy_veldiff + 50
-
-
-class Granda(Enemy):
-    """ Gamepad player class """
-    def __init__(self, id, xpos, ypos, imagebank=0,
-                 spritesheet_positions=[(112, 64)], attack_sprite_position=(128, 128), width=16, height=16,
-                 spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1):
-        super().__init__(id, xpos, ypos, imagebank, spritesheet_positions, attack_sprite_position, width, height,
-                         spritesheet_keycol, mass, momentum, velocity)
-
-        self.poly = pymunk.Circle(self.body, (self.width / 2), offset=(0, 0))
-        self.poly.collision_type = 1
-        self.player_num = player_num
-        self.facing = 'left'
-        self.attack_power = settings.enemy_attack_power + 3
-        self.attack_length = settings.enemy_attack_length
-        self.btn_ctx = {'up': False, 'down': False, 'left': False, 'right': False, 'a': False, 'b': False}
-        self.veldiff = settings.enemy_veldiff + 50
-
-
-class Boss(Enemy):
-    """ Gamepad player class """
-    def __init__(self, id, xpos, ypos, imagebank=0,
-                 spritesheet_positions=[(128, 0)], attack_sprite_position=(64, 64), width=16, height=16,
-                 spritesheet_keycol=0, mass=1, momentum=1, velocity=(0, 0), player_num=1):
-        super().__init__(id, xpos, ypos, imagebank, spritesheet_positions, attack_sprite_position, width, height,
-                         spritesheet_keycol, mass, momentum, velocity, max_health=settings.boss_max_health)
-
-        self.poly = pymunk.Circle(self.body, (self.width / 2), offset=(0, 0))
-        self.poly.collision_type = 1
-        self.player_num = player_num
-        self.facing = 'left'
-        self.attack_power = settings.boss_attack_power
-        self.attack_length = settings.enemy_attack_length
-        self.btn_ctx = {'up': False, 'down': False, 'left': False, 'right': False, 'a': False, 'b': False}
-        self.veldiff = settings.enemy_veldiff + 150
-        self.attack_frames = pymunk.inf
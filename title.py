@@ -1,16 +1,15 @@
 import logging
-import sys
+import logsetup
 import pyxel
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)
+logsetup.configure()
 
 
 class Title:
     """ Class used for game """
     def __init__(self):
         logger.info("title initialized.")
-        pyxel.image(2).load(0, 0, "assets/Title-export.png")
 
     def update(self):
         # logger.debug("title.update()")